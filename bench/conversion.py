@@ -0,0 +1,91 @@
+"""
+Per-diagnostic cost of turning engine output into gitlab issues, building
+the nested models one by one vs one pass through `trusted`'s shared
+`TypeAdapter`, fingerprinting included.
+
+    python bench/conversion.py [n]
+"""
+from collections.abc import Callable
+from time import perf_counter_ns
+import sys
+
+from typy.engine.mypy.command import Module as Mypy
+from typy.engine.mypy.models import Message
+from typy.engine.pyrefly.command import Module as Pyrefly
+from typy.engine.pyrefly.models import Error
+from typy.engine.pyright.command import Module as Pyright
+from typy.engine.pyright.models import GeneralDiagnostic
+from typy.engine.ty.command import Module as Ty
+from typy.formats import trusted
+from typy.formats.issue import GitlabIssue, LineColumnPosition, Location, PositionRange
+from typy.utils.fingerprint import fingerprint_issue
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+PATH = '/project/src/module.py'
+
+def mypy(i: int):
+    return Message(file=PATH, line=i+1, column=4, message=f'Revealed type is "builtins.int" ({i})', hint=None, code='misc', severity='note')
+
+def pyrefly(i: int):
+    return Error(
+        line=i+1, column=5, stop_line=i+1, stop_column=9, path=PATH, code=-2, name='reveal-type',
+        description=f'revealed type: int ({i})', concise_description='revealed type: int', severity='info',
+    )
+
+def pyright(i: int):
+    return GeneralDiagnostic.model_validate({
+        'file': PATH, 'severity': 'information', 'message': f'Type of "x" is "int" ({i})',
+        'range': {'start': {'line': i, 'character': 12}, 'end': {'line': i, 'character': 13}},
+    })
+
+def ty(i: int):
+    # a published LSP diagnostic; `ty check` output is already gitlab JSON
+    return {
+        'code': 'revealed-type', 'message': f'Revealed type: `int` ({i})', 'severity': 3,
+        'range': {'start': {'line': i, 'character': 12}, 'end': {'line': i, 'character': 13}},
+    }
+
+CASES: dict[str, tuple[Callable[[int], object], Callable[[object], object]]] = {
+    'mypy': (mypy, lambda x: fingerprint_issue(Mypy._issue(x))), # type: ignore
+    'pyrefly': (pyrefly, lambda x: fingerprint_issue(Pyrefly._issue(x))), # type: ignore
+    'pyright': (pyright, lambda x: fingerprint_issue(Pyright._issue(x))), # type: ignore
+    'ty': (ty, lambda x: Ty._lsp_issue(PATH, x)), # type: ignore
+}
+
+ADAPTER = trusted.issue
+
+def per_model(
+    check_name: str, description: str, path: str,
+    begin_line: int, begin_column: int, end_line: int, end_column: int,
+    severity=None, fingerprint=None,
+) -> GitlabIssue:
+    return GitlabIssue(
+        check_name=check_name,
+        description=description,
+        severity=severity,
+        fingerprint=fingerprint,
+        location=Location(
+            path=path,
+            positions=PositionRange(
+                begin=LineColumnPosition(line=begin_line, column=begin_column),
+                end=LineColumnPosition(line=end_line, column=end_column),
+            ),
+        ),
+    )
+
+def measure(convert: Callable[[object], object], inputs: list[object], build: Callable[..., GitlabIssue]) -> float:
+    trusted.issue = build
+    best = float('inf')
+    for _ in range(5):
+        start = perf_counter_ns()
+        for x in inputs:
+            convert(x)
+        best = min(best, (perf_counter_ns() - start) / len(inputs))
+    return best
+
+print(f'{"engine":<10}{"per model":>12}{"adapter":>12}{"speedup":>10}  (ns/diagnostic, n={N})')
+for name, (make, convert) in CASES.items():
+    inputs = [make(i) for i in range(N)]
+    slow = measure(convert, inputs, per_model)
+    fast = measure(convert, inputs, ADAPTER)
+    print(f'{name:<10}{slow:>12.0f}{fast:>12.0f}{slow/fast:>9.2f}x')
@@ -5,10 +5,8 @@ import rich
 
 SAMPLE_FILE = 'test/files/sample_file.py'
 
-for engine in typy.engine.available:
-    engine = typy.engine.get(engine)
-    result = engine.report(files=[SAMPLE_FILE])
+for result in typy.engine.run_all(files=[SAMPLE_FILE]):
+    engine = typy.engine.get(result.emitter.name)
     # result.show()
     for issue in result.issues:
         print(engine.parse_reveal_type(issue.description))
-
@@ -1,2 +1,21 @@
-from . import engine
-from .engine import Engine
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from .utils.lazy import lazy
+
+if TYPE_CHECKING:
+    from . import baseline, bench, cli, consensus, engine, watch
+    from .cli import main
+    from .engine import Engine
+    from .reveal import reveal_types
+
+__getattr__, __dir__ = lazy(__name__, {
+    'baseline': '.baseline',
+    'bench': '.bench',
+    'cli': '.cli',
+    'consensus': '.consensus',
+    'engine': '.engine',
+    'watch': '.watch',
+    'main': '.cli:main',
+    'Engine': '.engine.common:Engine',
+    'reveal_types': '.reveal:reveal_types',
+})
@@ -0,0 +1,91 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+import json
+import os
+
+from typy.formats import gitlab, issue, report as Report
+from typy.utils.fingerprint import ShiftResistant
+from typy.utils.jsonstream import JSONStreamError, iter_array
+
+# tags reports written by `save`, whose fingerprints are `ShiftResistant`'s
+SCHEME = 'typy-shift-resistant-1'
+
+def _stored(path: Path, root: Path) -> Iterator[tuple[dict[str, Any], str]]:
+    # issues saved by `save` carry their key; those of any other gitlab report
+    # (or array of issues) follow another scheme and are keyed like current issues
+    key = ShiftResistant(root)
+    members = dict[str, object]()
+    with path.open(encoding='utf8') as f:
+        try:
+            for x in iter_array(f, 'issues', members=members, bare=True):
+                if isinstance(x, dict):
+                    stored = x.get('fingerprint', None) if members.get('fingerprints', None) == SCHEME else None
+                    yield x, stored or key(gitlab.Issue.model_validate(x))
+        except (JSONStreamError, json.JSONDecodeError) as e:
+            raise ValueError(f'{path} is not a gitlab report or array of issues: {e}') from e
+
+def save(reports: Iterable[gitlab.Report], path: str|Path, root: None|str|Path = None) -> gitlab.Report:
+    """
+    Writes the issues of all `reports` as a single gitlab report. Issues are
+    fingerprinted by the content of their line rather than its number, and by
+    their path relative to `root` (the working directory), so edits that only
+    move them around don't change the baseline, nor does another checkout.
+    """
+    reports = list(reports)
+    key = ShiftResistant(Path(root or os.getcwd()))
+    report = gitlab.Report(
+        issues=[x.model_copy(update={'fingerprint': key(x)}) for report in reports for x in report.issues],
+        elapsed=sum((report.elapsed for report in reports), timedelta()),
+        time=min((report.time for report in reports), default=datetime.now()),
+        emitter=Report.Emitter(name='+'.join(report.emitter.name for report in reports) or 'typy', version=None),
+    )
+
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    # the tag comes first, so loading knows the scheme before reaching the issues
+    tmp.write_text(json.dumps({'fingerprints': SCHEME, **report.model_dump(mode='json')}))
+    os.replace(tmp, path)
+    return report
+
+class Baseline:
+    """
+    Fingerprints of a stored gitlab report. Loading streams the report and
+    keeps only the fingerprints; issues are never validated. Current issues
+    are compared by their `ShiftResistant` fingerprints, with paths relative
+    to `root` (the working directory).
+    """
+    def __init__(self, path: str|Path, root: None|str|Path = None):
+        self.path = Path(path)
+        self.root = Path(root or os.getcwd())
+        self.fingerprints = {key for _, key in _stored(self.path, self.root)}
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def __contains__(self, x: issue.GitlabIssue) -> bool:
+        return ShiftResistant(self.root)(x) in self.fingerprints
+
+    def new(self, issues: Iterable[issue.GitlabIssue]) -> Iterator[issue.GitlabIssue]:
+        """Issues not present in the baseline."""
+        key = ShiftResistant(self.root)
+        for x in issues:
+            if key(x) not in self.fingerprints:
+                yield x
+
+    def fixed(self, issues: Iterable[issue.GitlabIssue]) -> Iterator[gitlab.Issue]:
+        """Baseline issues absent from `issues`, re-read from the stored report."""
+        current = set(map(ShiftResistant(self.root), issues))
+        gone = self.fingerprints - current
+        if not gone:
+            return
+
+        for x, key in _stored(self.path, self.root):
+            if key in gone:
+                yield gitlab.Issue.model_validate(x)
+
+def diff(baseline: Baseline, reports: Iterable[gitlab.Report]) -> tuple[list[gitlab.Issue], list[gitlab.Issue]]:
+    """The (new, fixed) issues of `reports` relative to `baseline`."""
+    issues = [x for report in reports for x in report.issues]
+    return list(baseline.new(issues)), list(baseline.fixed(issues))
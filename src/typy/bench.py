@@ -0,0 +1,228 @@
+"""
+Engine benchmarks over synthetic corpora. Every sample runs in a fresh
+(spawned) worker process, so peak RSS is per run and nothing is shared
+between repetitions but the OS page cache and the engines' own caches.
+"""
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+
+from pydantic import BaseModel
+
+from typy.engine.common import get
+from typy.engine.registry import registry
+from typy.engine.version import versions
+
+class Corpus(BaseModel):
+    files: int
+    functions: int
+    density: float
+    seed: int
+    lines: int
+    # functions generated with a type error
+    errors: int
+
+class Sample(BaseModel):
+    wall_ns: int
+    # ReportBase.elapsed: self-reported by pyright, the process wall time otherwise
+    engine_ns: int
+    issues: int
+    # total duration of each typy.utils.trace span name (spawn, parse, validate, ...)
+    stages: dict[str, int] = {}
+    # peak RSS of the worker process and of the processes it waited for
+    worker_rss: None|int
+    children_rss: None|int
+
+    @property
+    def overhead_ns(self) -> int:
+        return max(self.wall_ns - self.engine_ns, 0)
+
+class Stats(BaseModel):
+    min: float
+    median: float
+    mean: float
+    max: float
+
+    @staticmethod
+    def of(xs: Iterable[float]) -> 'Stats':
+        xs = list(xs)
+        return Stats(min=min(xs), median=statistics.median(xs), mean=statistics.fmean(xs), max=max(xs))
+
+class EngineResult(BaseModel):
+    version: str
+    samples: list[Sample]
+    wall_s: Stats
+    engine_s: Stats
+    overhead_s: Stats
+    issues_per_second: Stats
+    # the engine's own process: the worker for in-process engines, its children otherwise
+    peak_rss: None|int
+
+class Results(BaseModel):
+    time: datetime
+    python: str
+    platform: str
+    corpus: Corpus
+    reps: int
+    warmup: int
+    engines: dict[str, EngineResult]
+
+def corpus(directory: str|Path, files: int = 10, functions: int = 20, density: float = 0.1, seed: int = 0) -> tuple[list[Path], Corpus]:
+    """
+    Writes `files` modules of `functions` functions each into `directory`.
+    A `density` fraction of the functions return the wrong type; every
+    module imports the previous one.
+    """
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    paths = list[Path]()
+    lines = errors = 0
+    for i in range(files):
+        source = list[str]()
+        if i:
+            source += [f'from bench_{i-1} import f_{i-1}_0', '']
+        for j in range(functions):
+            bad = rng.random() < density
+            errors += bad
+            call = f'f_{i-1}_0(x, y)' if i and j == 0 else 'y'
+            source += [
+                f'def f_{i}_{j}(x: int, y: str) -> str:',
+                f'    z = x * {j + 1}',
+                f'    return {"z" if bad else f"{call} + str(z)"}',
+                '',
+            ]
+        lines += len(source)
+        path = directory / f'bench_{i}.py'
+        path.write_text('\n'.join(source))
+        paths.append(path)
+
+    return paths, Corpus(files=files, functions=functions, density=density, seed=seed, lines=lines, errors=errors)
+
+def _rss() -> tuple[None|int, None|int]:
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    )
+
+def _sample(name: str, files: list[str], kwargs: dict[str, object]) -> Sample:
+    # engines resolve imports from the working directory; this process is ours alone
+    os.chdir(os.path.dirname(files[0]))
+    engine = get(name)
+    start = perf_counter_ns()
+    report = engine.report(files=files, **kwargs)
+    wall = perf_counter_ns() - start
+    worker_rss, children_rss = _rss()
+
+    stages = dict[str, int]()
+    for span in report.timings or ():
+        stages[span.name] = stages.get(span.name, 0) + span.duration_ns
+
+    return Sample(
+        wall_ns=wall,
+        engine_ns=int(report.elapsed.total_seconds() * 1e9),
+        issues=len(report.issues),
+        stages=stages,
+        worker_rss=worker_rss,
+        children_rss=children_rss,
+    )
+
+def measure(name: str, files: list[Path], reps: int = 5, warmup: int = 1, **kwargs: object) -> EngineResult:
+    engine = get(name)
+    # one fresh process per sample
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'), max_tasks_per_child=1) as executor:
+        samples = [
+            executor.submit(_sample, name, list(map(str, files)), kwargs).result()
+            for _ in range(warmup + reps)
+        ][warmup:]
+
+    rss = [x.worker_rss if not engine.capabilities.parallelizable else x.children_rss for x in samples]
+    return EngineResult(
+        version=engine.version(),
+        samples=samples,
+        wall_s=Stats.of(x.wall_ns / 1e9 for x in samples),
+        engine_s=Stats.of(x.engine_ns / 1e9 for x in samples),
+        overhead_s=Stats.of(x.overhead_ns / 1e9 for x in samples),
+        issues_per_second=Stats.of(x.issues / (x.wall_ns / 1e9) for x in samples),
+        peak_rss=None if None in rss else max(x for x in rss if x is not None),
+    )
+
+def run(
+    engines: None|list[str] = None,
+    files: int = 10,
+    functions: int = 20,
+    density: float = 0.1,
+    seed: int = 0,
+    reps: int = 5,
+    warmup: int = 1,
+    directory: None|str|Path = None,
+    **kwargs: object,
+) -> Results:
+    with tempfile.TemporaryDirectory(prefix='typy-bench-') as tmp:
+        paths, description = corpus(directory or Path(tmp) / 'corpus', files, functions, density, seed)
+
+        # resolve versions once, so workers don't time `--version` calls
+        previous, persisted = os.environ.get('TYPY_VERSION_CACHE', None), versions.path
+        versions.persist(Path(tmp) / 'versions.json')
+        os.environ['TYPY_VERSION_CACHE'] = str(Path(tmp) / 'versions.json')
+        try:
+            names = engines or registry.names()
+            for name in names:
+                get(name).version()
+
+            results = {name: measure(name, paths, reps, warmup, **kwargs) for name in names}
+        finally:
+            versions.path = persisted
+            if previous is None:
+                os.environ.pop('TYPY_VERSION_CACHE', None)
+            else:
+                os.environ['TYPY_VERSION_CACHE'] = previous
+
+    return Results(
+        time=datetime.now(),
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        corpus=description,
+        reps=reps,
+        warmup=warmup,
+        engines=results,
+    )
+
+class Change(BaseModel):
+    engine: str
+    metric: str
+    old: float
+    new: float
+
+    @property
+    def ratio(self) -> float:
+        return self.new / self.old - 1 if self.old else 0.0
+
+METRICS = ('wall_s', 'engine_s', 'overhead_s')
+
+def compare(old: Results, new: Results) -> list[Change]:
+    """Median times and peak RSS of the engines present in both results."""
+    changes = list[Change]()
+    for name in old.engines.keys() & new.engines.keys():
+        a, b = old.engines[name], new.engines[name]
+        for metric in METRICS:
+            changes.append(Change(engine=name, metric=metric, old=getattr(a, metric).median, new=getattr(b, metric).median))
+        if a.peak_rss is not None and b.peak_rss is not None:
+            changes.append(Change(engine=name, metric='peak_rss', old=a.peak_rss, new=b.peak_rss))
+    return sorted(changes, key=lambda x: (x.engine, x.metric))
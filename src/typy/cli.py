@@ -0,0 +1,181 @@
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Literal
+import argparse
+import sys
+
+from typy import baseline
+from typy.engine import run_all
+from typy.engine.registry import registry
+from typy.engine.cache import ReportCache
+from typy.engine.common import get
+from typy.formats import gitlab, stream
+from typy.formats.report import Emitter
+from typy.formats.stream import Output
+
+Format = Literal['gitlab', 'codeclimate', 'codeclimate-nul', 'standard', 'sarif', 'jsonl']
+formats: tuple[Format, ...] = Format.__args__
+
+def _writer(format: Format, out: Output) -> stream.Writer:
+    match format:
+        case 'gitlab':
+            return stream.GitlabWriter(out)
+        case 'codeclimate':
+            return stream.CodeclimateWriter(out, array=True)
+        case 'codeclimate-nul':
+            return stream.CodeclimateWriter(out)
+        case 'standard':
+            return stream.StandardWriter(out)
+        case 'sarif':
+            return stream.SarifWriter(out)
+        case 'jsonl':
+            return stream.JsonlWriter(out)
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='typy', description='Run several Python type checkers as one.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def common(command: argparse.ArgumentParser):
+        command.add_argument('files', nargs='+', type=Path)
+        command.add_argument('-e', '--engine', action='append', choices=registry.names(), dest='engines',
+                             help='engine to run (repeatable, default: all)')
+        command.add_argument('-j', '--jobs', type=int, default=None, help='engines to run concurrently')
+        command.add_argument('--cache', type=Path, default=None, help='reuse reports stored in this directory')
+
+    check = commands.add_parser('check', help='type check files, writing issues as each engine finishes')
+    common(check)
+    check.add_argument('-f', '--format', choices=formats, default='gitlab')
+    check.add_argument('-o', '--output', type=Path, default=None, help='write here instead of stdout')
+    check.add_argument('--baseline', type=Path, help='only report issues missing from this stored report')
+    check.add_argument('--agree', type=int, default=None, metavar='N',
+                       help='merge issues at the same location across engines, keeping those reported by at least N')
+    check.add_argument('--stream', action='store_true',
+                       help='run the engines one at a time, writing issues as they are reported')
+
+    base = commands.add_parser('baseline', help='manage stored baseline reports')
+    base_commands = base.add_subparsers(dest='baseline_command', required=True)
+    save = base_commands.add_parser('save', help='type check files and store the report as a baseline')
+    common(save)
+    save.add_argument('-o', '--output', type=Path, default=Path('typy-baseline.json'))
+
+    bench = commands.add_parser('bench', help='benchmark the engines on a synthetic corpus')
+    bench_commands = bench.add_subparsers(dest='bench_command', required=True)
+    run = bench_commands.add_parser('run', help='time each engine and write JSON results')
+    run.add_argument('-e', '--engine', action='append', choices=registry.names(), dest='engines',
+                     help='engine to run (repeatable, default: all)')
+    run.add_argument('--files', type=int, default=10, help='modules in the corpus')
+    run.add_argument('--functions', type=int, default=20, help='functions per module')
+    run.add_argument('--density', type=float, default=0.1, help='fraction of functions with a type error')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--reps', type=int, default=5, help='measured runs per engine')
+    run.add_argument('--warmup', type=int, default=1, help='discarded runs per engine')
+    run.add_argument('-o', '--output', type=Path, default=None, help='write here instead of stdout')
+    cmp = bench_commands.add_parser('compare', help='compare two results, failing on regressions')
+    cmp.add_argument('old', type=Path)
+    cmp.add_argument('new', type=Path)
+    cmp.add_argument('--threshold', type=float, default=0.1, help='relative slowdown counted as a regression')
+
+    return parser
+
+def _reports(args: argparse.Namespace):
+    cache = None if args.cache is None else ReportCache(args.cache)
+    return run_all(files=args.files, engines=args.engines, max_workers=args.jobs, cache=cache)
+
+def _streamed(args: argparse.Namespace) -> Iterator[tuple[Emitter, Iterable[gitlab.Issue]]]:
+    for name in args.engines or registry.names():
+        engine = get(name)
+        yield Emitter(name=name, version=engine.version()), engine.iter_issues(files=args.files)
+
+def check(args: argparse.Namespace) -> int:
+    if args.stream and (args.cache is not None or args.agree is not None):
+        print('typy check: --stream can\'t be combined with --cache or --agree', file=sys.stderr)
+        return 2
+
+    try:
+        stored = None if args.baseline is None else baseline.Baseline(args.baseline)
+    except (OSError, ValueError) as e:
+        print(f'typy check: --baseline: {e}', file=sys.stderr)
+        return 2
+    current = list[gitlab.Issue]()
+    count = 0
+
+    def seen(issues: Iterable[gitlab.Issue]) -> Iterator[gitlab.Issue]:
+        for x in issues:
+            current.append(x)
+            yield x
+
+    if args.stream:
+        batches = _streamed(args)
+    else:
+        reports = _reports(args)
+        if args.agree is not None:
+            from typy import consensus
+
+            # the baseline is compared against what the engines reported, not the merge
+            reports = list(reports)
+            if stored is not None:
+                current.extend(x for report in reports for x in report.issues)
+            reports = [consensus.merge(reports, min_engines=args.agree)]
+        batches = ((report.emitter, report.issues) for report in reports)
+
+    out: Output = sys.stdout if args.output is None else args.output.open('wb')
+    try:
+        with _writer(args.format, out) as writer:
+            for emitter, issues in batches:
+                if stored is not None:
+                    issues = stored.new(issues if args.agree is not None else seen(issues))
+                count += writer.write(issues, emitter)
+                writer.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if stored is not None:
+        fixed = list(stored.fixed(current))
+        for x in fixed:
+            print(f'fixed: {x.location.path}: [{x.check_name}] {x.description}', file=sys.stderr)
+        print(f'{count} new, {len(fixed)} fixed (baseline: {len(stored)})', file=sys.stderr)
+
+    return 1 if count else 0
+
+def bench(args: argparse.Namespace) -> int:
+    from typy.bench import Results, compare, run
+
+    match args.bench_command:
+        case 'run':
+            results = run(
+                engines=args.engines, files=args.files, functions=args.functions, density=args.density,
+                seed=args.seed, reps=args.reps, warmup=args.warmup,
+            )
+            text = results.model_dump_json(indent=2) + '\n'
+            if args.output is None:
+                sys.stdout.write(text)
+            else:
+                args.output.write_text(text)
+            return 0
+        case 'compare':
+            old = Results.model_validate_json(args.old.read_text())
+            new = Results.model_validate_json(args.new.read_text())
+            regressions = 0
+            for x in compare(old, new):
+                regressed = x.ratio > args.threshold
+                regressions += regressed
+                print(f'{x.engine:10} {x.metric:12} {x.old:>14.6g} {x.new:>14.6g} {x.ratio:+8.1%}{"  !" if regressed else ""}')
+            return 1 if regressions else 0
+
+    return 2
+
+def main(argv: None|Sequence[str] = None) -> int:
+    args = _parser().parse_args(argv)
+
+    match args.command:
+        case 'check':
+            return check(args)
+        case 'baseline':
+            report = baseline.save(_reports(args), args.output)
+            print(f'saved {len(report.issues)} issues to {args.output}', file=sys.stderr)
+            return 0
+        case 'bench':
+            return bench(args)
+
+    return 2
@@ -0,0 +1,204 @@
+"""
+Cross-engine consensus. Issues of several reports are grouped by path and
+line, and issues whose column ranges overlap are clustered by a sweep over
+each group, so building the index is O(n log n) in the number of issues.
+Within a cluster, engines only agree on an issue if their findings overlap
+it; a chain of overlapping ranges doesn't make its ends agree.
+"""
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+import gc
+import threading
+from typing import NamedTuple, get_args
+
+from pydantic import BaseModel
+
+from typy.formats import gitlab, issue, trusted, report as Report
+from typy.formats.report import ReportBase
+from typy.utils.path import resolve_path
+
+# issues spanning several lines cover the rest of their first line
+END = 2**31
+
+SEVERITY_RANK = {x: i for i, x in enumerate(get_args(issue.Severity))}
+
+class Finding(NamedTuple):
+    engine: str
+    issue: issue.GitlabIssue
+    # column range on the cluster's line
+    begin: int
+    end: int
+
+def _rank(x: Finding) -> int:
+    return -SEVERITY_RANK.get(x.issue.severity or 'info', 0)
+
+class Cluster(BaseModel):
+    # resolved, whatever the engines reported
+    path: str
+    # 0 for issues located by offsets, whose "columns" are offsets
+    line: int
+    begin_column: int
+    end_column: int
+    findings: list[Finding]
+    slack: int = 0
+
+    @property
+    def engines(self) -> list[str]:
+        return sorted({x.engine for x in self.findings})
+
+    def groups(self) -> list[list[Finding]]:
+        """
+        The findings as separate issues. Each group starts with its
+        representative, the most severe remaining finding (the leftmost among
+        equals), followed by at most one finding of every other engine that
+        overlaps it; findings of one engine are never merged.
+        """
+        if len(self.findings) == 1:
+            return [self.findings]
+
+        groups = list[list[Finding]]()
+        left = sorted(self.findings, key=_rank)
+        while left:
+            first, rest, left = left[0], left[1:], []
+            group, engines = [first], {first.engine}
+            for x in rest:
+                if x.engine not in engines and x.begin <= first.end + self.slack and first.begin <= x.end + self.slack:
+                    group.append(x)
+                    engines.add(x.engine)
+                else:
+                    left.append(x)
+            groups.append(group)
+        return groups
+
+    @property
+    def agreement(self) -> int:
+        """The most engines agreeing on one of the cluster's issues."""
+        return max(map(len, self.groups()))
+
+    def representative(self) -> Finding:
+        """The most severe finding, the leftmost among equals."""
+        return min(self.findings, key=_rank)
+
+class ConsensusIssue(gitlab.Issue):
+    engines: list[str]
+    agreement: int
+
+class ConsensusReport(ReportBase[ConsensusIssue]): ...
+
+def _span(x: issue.GitlabIssue) -> tuple[int, int, int]:
+    location = x.location
+    if location.positions is not None:
+        begin, end = location.positions.begin, location.positions.end
+        if isinstance(begin, issue.OffsetPosition):
+            assert isinstance(end, issue.OffsetPosition)
+            return 0, begin.offset, end.offset
+        assert isinstance(end, issue.LineColumnPosition)
+        return begin.line, begin.column, end.column if end.line == begin.line else END
+    assert location.lines is not None
+    return location.lines.begin, 0, END
+
+# nested and concurrent pauses, and whether collection was enabled before the first
+_paused = 0
+_resume = False
+_paused_lock = threading.Lock()
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # building allocates a few objects per issue but no cyclic garbage; collections
+    # triggered by them would otherwise take most of the time on large reports.
+    # Collection is process-wide, so it resumes only when the last pause ends
+    global _paused, _resume
+    with _paused_lock:
+        if not _paused:
+            _resume = gc.isenabled()
+            gc.disable()
+        _paused += 1
+    try:
+        yield
+    finally:
+        with _paused_lock:
+            _paused -= 1
+            if not _paused and _resume:
+                gc.enable()
+
+class Index:
+    """
+    Clusters of overlapping issues from different reports, by (path, line).
+    Within a line, clusters are disjoint column ranges sorted by their start.
+    `slack` also joins ranges that are up to that many columns apart.
+    """
+    def __init__(self, reports: Iterable[ReportBase], slack: int = 0):
+        self.reports = list(reports)
+        with _gc_paused():
+            self._build(slack)
+
+    def _build(self, slack: int):
+        groups = dict[tuple[str, int], list[tuple[int, int, int, Finding]]]()
+        for report in self.reports:
+            for order, x in enumerate(report.issues):
+                line, begin, end = _span(x)
+                end = max(end, begin)
+                groups.setdefault((resolve_path(x.location.path), line), []).append((begin, end, order, Finding(report.emitter.name, x, begin, end)))
+
+        self._lines = dict[tuple[str, int], list[Cluster]]()
+        for (path, line), spans in groups.items():
+            spans.sort(key=lambda x: x[:3])
+            # [begin, end, findings] of each cluster, swept left to right
+            sweep = list[list]()
+            for begin, end, _, finding in spans:
+                if sweep and begin <= sweep[-1][1] + slack:
+                    sweep[-1][1] = max(sweep[-1][1], end)
+                    sweep[-1][2].append(finding)
+                else:
+                    sweep.append([begin, end, [finding]])
+            self._lines[(path, line)] = [
+                Cluster.model_construct(path=path, line=line, begin_column=begin, end_column=end, findings=findings, slack=slack)
+                for begin, end, findings in sweep
+            ]
+        self._begins = {key: [x.begin_column for x in clusters] for key, clusters in self._lines.items()}
+
+    def __iter__(self) -> Iterator[Cluster]:
+        for key in sorted(self._lines):
+            yield from self._lines[key]
+
+    def __len__(self) -> int:
+        return sum(map(len, self._lines.values()))
+
+    def at(self, path: str|Path, line: int, column: None|int = None) -> list[Cluster]:
+        """The clusters on `line`, or the one covering `column` there."""
+        key = (resolve_path(path), line)
+        clusters = self._lines.get(key, [])
+        if column is None:
+            return list(clusters)
+        i = bisect_right(self._begins[key], column) - 1
+        return [clusters[i]] if i >= 0 and clusters[i].end_column >= column else []
+
+    def agreed(self, min_engines: int = 2) -> Iterator[Cluster]:
+        """Clusters with an issue reported by at least `min_engines` different engines."""
+        return (x for x in self if x.agreement >= min_engines)
+
+    def report(self, min_engines: int = 1) -> ConsensusReport:
+        """One issue per agreed group of findings: its representative, with the engines that reported it."""
+        issues = list[ConsensusIssue]()
+        with _gc_paused():
+            for cluster in self:
+                for group in cluster.groups():
+                    if len(group) >= min_engines:
+                        engines = sorted(x.engine for x in group)
+                        issues.append(trusted.extend(
+                            ConsensusIssue, group[0].issue, engines=engines, agreement=len(engines),
+                        ))
+
+        return ConsensusReport(
+            issues=issues,
+            elapsed=max((x.elapsed for x in self.reports), default=timedelta()),
+            # some engines report aware times, others naive (local) ones
+            time=min((x.time for x in self.reports), key=datetime.timestamp, default=datetime.now()),
+            emitter=Report.Emitter(name='+'.join(x.emitter.name for x in self.reports) or 'typy', version=None),
+        )
+
+def merge(reports: Iterable[ReportBase], min_engines: int = 1, slack: int = 0) -> ConsensusReport:
+    return Index(reports, slack).report(min_engines)
@@ -1,5 +1,38 @@
-from .mypy import Module as mypy
-from .pyright import Module as pyright
-from .pyrefly import Module as pyrefly
-from .ty import Module as ty
-from .common import get, Engine, available, modules
\ No newline at end of file
+from typing import TYPE_CHECKING
+import sys
+import types
+
+from typy.utils.lazy import lazy
+from .common import get, Engine
+from .registry import BUILTIN, Registry
+
+if TYPE_CHECKING:
+    from .common import available, modules
+    from .mypy import Module as mypy
+    from .pyright import Module as pyright
+    from .pyrefly import Module as pyrefly
+    from .ty import Module as ty
+    from .runner import run_all
+    from .shard import run_sharded
+
+# engines are only imported once used
+__getattr__, __dir__ = lazy(__name__, {
+    'mypy': '.mypy:Module',
+    'pyright': '.pyright:Module',
+    'pyrefly': '.pyrefly:Module',
+    'ty': '.ty:Module',
+    'available': '.common:available',
+    'modules': '.common:modules',
+    'run_all': '.runner:run_all',
+    'run_sharded': '.shard:run_sharded',
+})
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name: str, value: object):
+        # importing e.g. `typy.engine.mypy.models` binds the `mypy` subpackage
+        # here, but the name belongs to the engine class
+        if name in BUILTIN and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _Package
@@ -1,25 +1,69 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+import asyncio
+import functools
 import stat
+from typing import ClassVar
 
 from argbuilder import Command
 from pydantic import BaseModel
 
-from typy.formats import report
+from typy.formats import gitlab, report
+from typy.formats.report import ReportBase
+from typy.engine.overlay import Overlay, Sources, overlay
+from typy.utils import trace
 
 type Analysis = BaseModel
 
 class RevealType(BaseModel):
     typ: str
     sym: None|str
+    line: None|int = None
+
+class Capabilities(BaseModel, frozen=True):
+    # can run alongside other engines in the same process; otherwise it is
+    # given a worker process (e.g. mypy, which runs in-process and isn't re-entrant)
+    parallelizable: bool = True
+    # has a persistent server mode (a daemon or language server)
+    daemon: bool = False
+    # can check source text that isn't on disk; otherwise `sources` are
+    # written to an overlay directory (see typy.engine.overlay)
+    stdin: bool = False
+    # per-file results are independent, so file lists can be checked in shards
+    shardable: bool = False
+    # accepts a `threads` option
+    threads: bool = False
 
 class EngineModule(ABC):
+    name: ClassVar[str]
+    capabilities: ClassVar[Capabilities] = Capabilities()
+    # options that make per-file results independent when checking in shards
+    shard_options: ClassVar[dict[str, object]] = {}
+
+    @staticmethod
+    @abstractmethod
+    def version() -> str: ...
+
+    @staticmethod
+    @abstractmethod
+    def arguments(**kwargs: object) -> list[str]: ...
+
     @staticmethod
     @abstractmethod
     def run(**kwargs: object) -> Analysis: ...
 
     @staticmethod
     @abstractmethod
-    def report(**kwargs: object) -> report.ReportBase: ...
+    def report(**kwargs: object) -> ReportBase: ...
+
+    @staticmethod
+    def iter_issues(**kwargs: object) -> Iterator[gitlab.Issue]: ...
+
+    @staticmethod
+    async def arun(timeout: None|float = None, **kwargs: object) -> Analysis: ...
+
+    @staticmethod
+    async def areport(timeout: None|float = None, **kwargs: object) -> ReportBase: ...
 
     @staticmethod
     @abstractmethod
@@ -59,4 +103,71 @@ class EngineModule(ABC):
         if (len(commands) == 1) and ('command' not in variables):
             setattr(cls, 'command', commands[0])
 
+        if 'iter_issues' not in variables:
+            def iter_issues(**kwargs: object) -> Iterator[gitlab.Issue]:
+                yield from cls.report(**kwargs).issues
+            setattr(cls, 'iter_issues', staticmethod(iter_issues))
+
+        # engines without a native async path block a worker thread instead
+        if 'arun' not in variables:
+            async def arun(timeout: None|float = None, **kwargs: object) -> Analysis:
+                return await asyncio.wait_for(asyncio.to_thread(cls.run, **kwargs), timeout)
+            setattr(cls, 'arun', staticmethod(arun))
+
+        if 'areport' not in variables:
+            async def areport(timeout: None|float = None, **kwargs: object) -> ReportBase:
+                return await asyncio.wait_for(asyncio.to_thread(cls.report, **kwargs), timeout)
+            setattr(cls, 'areport', staticmethod(areport))
+
+        # engines that only read files check in-memory `sources` ({path: text}) in an overlay
+        if not cls.capabilities.stdin:
+            file_report, file_areport, file_iter_issues = cls.report, cls.areport, cls.iter_issues
+
+            @functools.wraps(file_report)
+            def overlay_report(sources: None|Sources = None, **kwargs: object) -> ReportBase:
+                if not sources:
+                    return file_report(**kwargs)
+                with overlay.checkout(sources) as files:
+                    return Overlay.restore(file_report(**Overlay.with_files(kwargs, files)), files)
+
+            @functools.wraps(file_areport)
+            async def overlay_areport(timeout: None|float = None, sources: None|Sources = None, **kwargs: object) -> ReportBase:
+                if not sources:
+                    return await file_areport(timeout, **kwargs)
+                with overlay.checkout(sources) as files:
+                    return Overlay.restore(await file_areport(timeout, **Overlay.with_files(kwargs, files)), files)
+
+            @functools.wraps(file_iter_issues)
+            def overlay_iter_issues(sources: None|Sources = None, **kwargs: object) -> Iterator[gitlab.Issue]:
+                if not sources:
+                    yield from file_iter_issues(**kwargs)
+                    return
+                with overlay.checkout(sources) as files:
+                    for x in file_iter_issues(**Overlay.with_files(kwargs, files)):
+                        yield Overlay.restore_issue(x, files)
+
+            setattr(cls, 'report', staticmethod(overlay_report))
+            setattr(cls, 'areport', staticmethod(overlay_areport))
+            setattr(cls, 'iter_issues', staticmethod(overlay_iter_issues))
+
+        # every report carries the spans recorded while producing it
+        report, areport = cls.report, cls.areport
+
+        @functools.wraps(report)
+        def traced_report(**kwargs: object) -> ReportBase:
+            with trace.collect() as spans, trace.span('report', engine=cls.name):
+                result = report(**kwargs)
+            result.timings = spans
+            return result
+
+        @functools.wraps(areport)
+        async def traced_areport(timeout: None|float = None, **kwargs: object) -> ReportBase:
+            with trace.collect() as spans, trace.span('areport', engine=cls.name):
+                result = await areport(timeout, **kwargs)
+            result.timings = spans
+            return result
+
+        setattr(cls, 'report', staticmethod(traced_report))
+        setattr(cls, 'areport', staticmethod(traced_areport))
+
         super().__init_subclass__()
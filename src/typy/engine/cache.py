@@ -0,0 +1,158 @@
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+import hashlib
+import os
+import threading
+
+from typy.engine.base import EngineModule
+from typy.formats import gitlab
+from typy.utils import trace
+from typy.utils.imports import import_closure
+from typy.utils.path import iter_python_files, resolve_path
+
+# checker configuration, looked up in the working directory and its parents
+CONFIG_FILES = (
+    'pyproject.toml', 'setup.cfg', 'mypy.ini', '.mypy.ini',
+    'pyrightconfig.json', 'pyrefly.toml', 'ty.toml',
+)
+
+def _name(path: Path, cwd: Path) -> str:
+    return str(path.relative_to(cwd)) if path.is_relative_to(cwd) else str(path)
+
+class ReportCache:
+    """
+    Content-addressed store of engine reports. Keys combine the engine name and
+    version, its command line, the checker configuration and the paths and
+    contents of every input file, of the files they import and of every
+    in-memory source; entries are evicted least-recently-used first once the
+    store grows past `max_bytes`.
+    """
+    def __init__(self, directory: str|Path, max_bytes: int = 256 * 2**20):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size: None|int = None
+
+    @staticmethod
+    def key(engine: type[EngineModule], **kwargs: object) -> str:
+        # hashed by content below; only mypy takes them as an argument
+        sources = kwargs.pop('sources', None) or {}
+        assert isinstance(sources, Mapping)
+        files = kwargs.get('files', None) or []
+        assert isinstance(files, list)
+
+        h = hashlib.sha256()
+        for part in (engine.name, engine.version(), *engine.arguments(**kwargs)):
+            h.update(part.encode('utf8'))
+            h.update(b'\0')
+
+        cwd = Path.cwd().resolve()
+        configs = (directory / name for directory in (cwd, *cwd.parents) for name in CONFIG_FILES)
+        # renaming a file changes the paths its issues are reported at
+        for file in (*filter(Path.is_file, configs), *sorted(import_closure(iter_python_files(files)))):
+            h.update(f'{_name(file, cwd)}\0'.encode('utf8'))
+            with open(file, 'rb') as f:
+                h.update(hashlib.file_digest(f, 'blake2b').digest())
+
+        for path, text in sorted((resolve_path(path), text) for path, text in sources.items()):
+            h.update(hashlib.blake2b(f'{path}\0{text}'.encode('utf8')).digest())
+
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> None|gitlab.Report:
+        """The stored report, whose `timings` are those of this lookup."""
+        with trace.collect() as spans, trace.span('cache'):
+            report = self._get(key)
+        if report is not None:
+            report.timings = spans
+        return report
+
+    def _get(self, key: str) -> None|gitlab.Report:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            report = gitlab.Report.model_validate_json(data)
+        except ValueError:
+            # corrupt (or from an incompatible version): dropped and recomputed
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+                if self._size is not None:
+                    self._size -= len(data)
+            return None
+
+        # mtime doubles as the LRU timestamp
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return report
+
+    def put(self, key: str, report: gitlab.Report):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        # timings belong to the run that produced the report, not to later hits
+        data = report.model_dump_json(exclude={'timings'}).encode('utf8')
+
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def report(self, engine: type[EngineModule], **kwargs: object) -> gitlab.Report:
+        key = ReportCache.key(engine, **kwargs)
+        if (cached := self.get(key)) is not None:
+            return cached
+
+        result = engine.report(**kwargs)
+        self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _entries(self) -> Iterator[tuple[Path, int, int]]:
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_mtime_ns
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(size for _, size, _ in entries)
+
+        for path, entry_size, _ in entries:
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+        self._size = size
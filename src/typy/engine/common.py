@@ -1,33 +1,24 @@
-from typing import Final, Literal
+from typing import TYPE_CHECKING, Final, Literal
 
-import typy
 from typy.engine.base import EngineModule
+from typy.engine.registry import NoSuchEngine, registry
 
-Engine = Literal['ty', 'pyright', 'pyrefly', 'mypy']
+if TYPE_CHECKING:
+    available: Final[list[str]]
+    modules: Final[list[type[EngineModule]]]
 
-from .ty import Module as ty
-from .pyright import Module as pyright
-from .pyrefly import Module as pyrefly
-from .mypy import Module as mypy
+# the built-in engines; plugins add more names to the registry
+Engine = Literal['ty', 'pyright', 'pyrefly', 'mypy']
 
-available: Final[list[Engine]] = Engine.__args__
-modules: Final[list[EngineModule]] = [
-    ty,
-    pyright,
-    pyrefly,
-    mypy,
-]
+NoSuchEngineException = lambda name: NoSuchEngine(name, registry.names())
 
-NoSuchEngineException = lambda name: ValueError(
-f"""
-Engine '{name}' not found. Available engines: {Engine.__args__}
-""")
+def get(name: Engine|str) -> type[EngineModule]:
+    return registry.get(name)
 
-def get(name: Engine) -> EngineModule:
-    if name not in Engine.__args__:
-        raise NoSuchEngineException(name)
-    
-    result = getattr(typy.engine, name)
-    assert isinstance(result, type)
-    assert issubclass(result, EngineModule)
-    return result
\ No newline at end of file
+def __getattr__(name: str) -> object:
+    match name:
+        case 'available':
+            return registry.names()
+        case 'modules':
+            return [get(x) for x in registry.names()]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
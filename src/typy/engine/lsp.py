@@ -0,0 +1,248 @@
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+from time import monotonic, perf_counter_ns
+import itertools
+import json
+import os
+import subprocess
+import threading
+
+from typy.formats import gitlab, report as Report
+from typy.utils.types import AnyDict
+
+type IssueFactory = Callable[[Path, AnyDict], gitlab.Issue]
+
+# hints and diagnostics tagged as unnecessary (e.g. unused variables) are for
+# editors to fade the code out; the engines' CLIs never report them
+HINT, UNNECESSARY = 4, 1
+
+def _reported(diagnostic: AnyDict) -> bool:
+    return diagnostic.get('severity', None) != HINT and UNNECESSARY not in diagnostic.get('tags', ())
+
+class LanguageServerError(RuntimeError): ...
+
+class LanguageServer:
+    """
+    A long-lived language server driven over stdio. Sources are pushed with
+    didOpen/didChange and the published diagnostics are mapped to gitlab issues.
+    """
+    def __init__(
+        self,
+        name: str,
+        command: list[str],
+        to_issue: IssueFactory,
+        version: Callable[[], str],
+        root: None|str|Path = None,
+        settings: None|AnyDict = None,
+        timeout: float = 30.0,
+    ):
+        self.name = name
+        self.command = command
+        self.to_issue = to_issue
+        self.version = version
+        self.root = Path(root or os.getcwd()).resolve()
+        self.settings: AnyDict = settings or {}
+        self.timeout = timeout
+
+        self._process: None|subprocess.Popen[bytes] = None
+        self._ids = itertools.count(1)
+        self._pending = dict[int, Future[AnyDict]]()
+        self._documents = dict[str, tuple[int, str]]()
+        self._diagnostics = dict[str, tuple[None|int, int, list[AnyDict]]]()
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._check_lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        if self.is_alive():
+            return
+
+        self._documents.clear()
+        self._diagnostics.clear()
+        self._process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.root,
+        )
+        threading.Thread(target=self._read, args=(self._process,), daemon=True).start()
+
+        self._request('initialize', {
+            'processId': os.getpid(),
+            'rootUri': self.root.as_uri(),
+            'workspaceFolders': [{'uri': self.root.as_uri(), 'name': self.root.name}],
+            'capabilities': {
+                'textDocument': {
+                    'synchronization': {'didSave': False},
+                    'publishDiagnostics': {'versionSupport': True},
+                },
+                'workspace': {'configuration': True, 'workspaceFolders': True},
+            },
+        }).result(self.timeout)
+        self._notify('initialized', {})
+
+    def close(self):
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+
+        try:
+            self._request('shutdown', None).result(self.timeout)
+            self._notify('exit', None)
+            process.wait(self.timeout)
+        except Exception:
+            process.kill()
+            process.wait()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+    def report(self, files: list[str|Path]) -> gitlab.Report:
+        return self.check({
+            file: Path(file).read_text(encoding='utf8')
+            for file in files
+        })
+
+    def check(self, sources: dict[str|Path, str]) -> gitlab.Report:
+        with self._check_lock:
+            self.start()
+            now = datetime.now()
+            start = perf_counter_ns()
+
+            with self._condition:
+                sequence = self._sequence
+
+            expected = dict[str, tuple[Path, int, None|int]]()
+            for file, text in sources.items():
+                path = Path(file).resolve()
+                uri = path.as_uri()
+
+                match self._documents.get(uri, None):
+                    case None:
+                        version = 1
+                        self._notify('textDocument/didOpen', {
+                            'textDocument': {'uri': uri, 'languageId': 'python', 'version': version, 'text': text},
+                        })
+                    case (current, previous) if previous != text:
+                        version = current + 1
+                        self._notify('textDocument/didChange', {
+                            'textDocument': {'uri': uri, 'version': version},
+                            'contentChanges': [{'text': text}],
+                        })
+                    case (current, _):
+                        expected[uri] = (path, current, None)
+                        continue
+
+                self._documents[uri] = (version, text)
+                expected[uri] = (path, version, sequence)
+
+            def ready(uri: str) -> bool:
+                published = self._diagnostics.get(uri, None)
+                if published is None:
+                    return False
+                published_version, published_sequence, _ = published
+                _, version, since = expected[uri]
+                if published_version is not None:
+                    return published_version >= version
+                return since is None or published_sequence > since
+
+            deadline = monotonic() + self.timeout
+            with self._condition:
+                while not all(map(ready, expected)):
+                    if not self.is_alive():
+                        raise LanguageServerError(f'{self.name} language server exited')
+                    if not self._condition.wait(deadline - monotonic()):
+                        raise TimeoutError(f'{self.name} language server did not publish diagnostics in time')
+
+                issues = [
+                    self.to_issue(path, diagnostic)
+                    for uri, (path, _, _) in expected.items()
+                    for diagnostic in self._diagnostics[uri][2]
+                    if _reported(diagnostic)
+                ]
+
+            elapsed = perf_counter_ns() - start
+
+        return gitlab.Report(
+            issues=issues,
+            elapsed=timedelta(microseconds=elapsed / 1000),
+            time=now,
+            emitter=Report.Emitter(name=self.name, version=self.version()),
+        )
+
+    def _send(self, message: AnyDict):
+        assert self._process and self._process.stdin
+        body = json.dumps({'jsonrpc': '2.0', **message}).encode('utf8')
+        with self._write_lock:
+            self._process.stdin.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+            self._process.stdin.flush()
+
+    def _request(self, method: str, params: object) -> Future[AnyDict]:
+        id = next(self._ids)
+        future = self._pending[id] = Future[AnyDict]()
+        self._send({'id': id, 'method': method, 'params': params})
+        return future
+
+    def _notify(self, method: str, params: object):
+        self._send({'method': method, 'params': params})
+
+    def _read(self, process: subprocess.Popen[bytes]):
+        assert process.stdout
+        stdout = process.stdout
+
+        while True:
+            headers = dict[str, str]()
+            while (line := stdout.readline().strip()):
+                key, _, value = line.decode('ascii').partition(':')
+                headers[key.lower()] = value.strip()
+
+            if not headers:
+                break
+
+            body = stdout.read(int(headers['content-length']))
+            self._dispatch(json.loads(body))
+
+        for future in self._pending.values():
+            future.set_exception(LanguageServerError(f'{self.name} language server exited'))
+        self._pending.clear()
+
+        with self._condition:
+            self._condition.notify_all()
+
+    def _dispatch(self, message: AnyDict):
+        method = message.get('method', None)
+
+        if method is None:
+            future = self._pending.pop(message['id'], None)
+            if future is None:
+                return
+            if 'error' in message:
+                future.set_exception(LanguageServerError(message['error'].get('message')))
+            else:
+                future.set_result(message.get('result'))
+
+        elif 'id' in message:
+            self._send({'id': message['id'], 'result': self._answer(method, message.get('params'))})
+
+        elif method == 'textDocument/publishDiagnostics':
+            params = message['params']
+            with self._condition:
+                self._sequence += 1
+                self._diagnostics[params['uri']] = (params.get('version', None), self._sequence, params['diagnostics'])
+                self._condition.notify_all()
+
+    def _answer(self, method: str, params: AnyDict) -> object:
+        if method == 'workspace/configuration':
+            return [self.settings.get(item.get('section'), None) for item in params['items']]
+        return None
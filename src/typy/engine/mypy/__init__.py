@@ -1,2 +1,4 @@
 from . import models
-from .command import Module
\ No newline at end of file
+from .command import Module
+from .daemon import Daemon
+from .pool import Pool
\ No newline at end of file
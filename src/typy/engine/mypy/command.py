@@ -1,23 +1,106 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import asyncio
+import functools
+import io
+import multiprocessing
+from multiprocessing.connection import Connection
+import queue
 import re
+from typing import Literal
 import warnings
-from typy.engine.base import EngineModule, RevealType
+from typy.engine.base import Capabilities, EngineModule, RevealType
+from typy.engine.overlay import Sources
+from typy.engine.version import versions
 from typy.utils.types import AnyDict
-from .models import Analysis
+from .models import Analysis, Message
+from .daemon import Daemon, default as default_daemon
+from .pool import Pool, default as default_pool
 from argbuilder import Command, Field # pyright: ignore[reportMissingTypeStubs]
+from argbuilder.builder import NOT_SET # pyright: ignore[reportMissingTypeStubs]
 from pathlib import Path
 from typy.utils.path import resolve_path, resolve_paths
-from typy.utils import fingerprint
+from typy.utils import trace
+from typy.utils.fingerprint import fingerprint_issue, fingerprint_table
 import json
 from hashlib import sha1
 
-from typy.formats import issue, gitlab, report as Report
+from typy.formats import issue, gitlab, trusted, IssueTable, report as Report
 type MypyAnalysis = Analysis
 
+class LineQueue(io.TextIOBase):
+    """A writable stream whose complete lines can be consumed from another thread."""
+    def __init__(self):
+        self._lines = queue.SimpleQueue[None|str]()
+        self._partial = ''
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        *lines, self._partial = (self._partial + s).split('\n')
+        for line in lines:
+            self._lines.put(line)
+        return len(s)
+
+    def close(self):
+        if not self.closed:
+            if self._partial:
+                self._lines.put(self._partial)
+            self._lines.put(None)
+        super().close()
+
+    def __iter__(self) -> Iterator[str]:
+        while (line := self._lines.get()) is not None:
+            yield line
+
+# mypy keeps global state and is not re-entrant, so async callers share one
+# thread, unless checks go to a worker pool
+EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='typy-mypy')
+
+def _isolated(send: Connection, method: str, kwargs: AnyDict):
+    try:
+        result = (True, getattr(Module, method)(**kwargs))
+    except BaseException as e:
+        result = (False, e)
+    send.send(result)
+
+async def _killable(method: str, timeout: float, kwargs: AnyDict):
+    # a thread can't be stopped, so checks that may time out get a process of their own
+    context = multiprocessing.get_context('spawn')
+    receive, send = context.Pipe(duplex=False)
+    process = context.Process(target=_isolated, args=(send, method, kwargs), daemon=True)
+    with trace.span('spawn'):
+        process.start()
+    send.close()
+
+    try:
+        with trace.span('compute'):
+            ok, result = await asyncio.wait_for(asyncio.to_thread(receive.recv), timeout)
+    except EOFError:
+        process.join()
+        raise Exception(f'mypy exited with code {process.exitcode}') from None
+    except BaseException:
+        process.kill()
+        process.join()
+        raise
+
+    process.join()
+    receive.close()
+    if not ok:
+        raise result
+    return result
+
 class Module(EngineModule):
+    name = 'mypy'
+    capabilities = Capabilities(parallelizable=False, daemon=True, stdin=True, shardable=True)
+    shard_options = {'follow_imports': 'silent'}
+
     class mypy(Command):
         files: list[Path] = Field('{value}', serializer=resolve_paths)
         output: str = Field('--output={value}', default='json')
+        follow_imports: Literal['normal', 'silent', 'skip', 'error'] = Field('--follow-imports={value}', default=NOT_SET)
         version: bool = Field('--version')
 
     SEVERITY: dict[str, issue.Severity] = {
@@ -26,11 +109,29 @@ class Module(EngineModule):
     }
 
     @staticmethod
-    def _run(**kwargs: AnyDict):
+    def arguments(daemon: None|bool|Daemon = None, pool: None|bool|Pool = None, sources: None|Sources = None, **kwargs: AnyDict) -> list[str]:
+        args = Module.mypy.from_dict(kwargs)
+        return args.build(with_self=False)
+
+    @staticmethod
+    def _run(daemon: None|bool|Daemon = None, pool: None|bool|Pool = None, sources: None|Sources = None, **kwargs: AnyDict):
         from time import perf_counter_ns
 
-        args = Module.mypy.from_dict(kwargs)
-        cl_args = args.build(with_self=False)
+        if pool:
+            pool = default_pool() if pool is True else pool
+            with trace.span('compute', pool=True):
+                return pool.check(sources=sources, **kwargs)
+
+        # dmypy only reads files, so in-memory sources are always built in-process
+        if sources:
+            return Module._build(sources, **kwargs)
+
+        cl_args = Module.arguments(**kwargs)
+
+        if daemon:
+            daemon = default_daemon() if daemon is True else daemon
+            with trace.span('compute', daemon=True):
+                return daemon.check(cl_args)
 
         import mypy.main as mypy
         import io
@@ -40,12 +141,13 @@ class Module(EngineModule):
 
         start = perf_counter_ns()
         try:
-            mypy.main(
-                args=cl_args,
-                stdout=stdout,
-                stderr=stderr,
-                clean_exit=True
-            )
+            with trace.span('compute'):
+                mypy.main(
+                    args=cl_args,
+                    stdout=stdout,
+                    stderr=stderr,
+                    clean_exit=True
+                )
         except SystemExit: pass
 
         stdout = stdout.getvalue()
@@ -54,6 +156,44 @@ class Module(EngineModule):
 
         return stdout, stderr, elapsed
 
+    @staticmethod
+    def _module(path: str, virtual: set[str]) -> str:
+        # like typy.utils.imports.module_name, counting virtual packages
+        parts = [] if Path(path).stem == '__init__' else [Path(path).stem]
+        parent = Path(path).parent
+        while str(parent / '__init__.py') in virtual or (parent / '__init__.py').exists():
+            parts.insert(0, parent.name)
+            parent = parent.parent
+        return '.'.join(parts)
+
+    @staticmethod
+    def _build(sources: Sources, files: None|list[str|Path] = None, **kwargs: AnyDict):
+        """Checks `files` and in-memory `sources` ({path: text}) without writing anything."""
+        from time import perf_counter_ns, time
+        from mypy.fscache import FileSystemCache
+        from mypy.main import process_options, run_build
+        from mypy.modulefinder import BuildSource
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+
+        start = perf_counter_ns()
+        fscache = FileSystemCache()
+        # `-c` stands in for the targets, which are replaced below
+        _, options = process_options([*Module.arguments(**kwargs), '-c', ''], stdout=stdout, stderr=stderr, fscache=fscache)
+        options.fast_exit = False
+
+        virtual = {resolve_path(path): text for path, text in sources.items()}
+        targets = [
+            *(BuildSource(path, Module._module(path, set()), None) for path in map(resolve_path, files or [])),
+            *(BuildSource(path, Module._module(path, set(virtual)), text) for path, text in virtual.items()),
+        ]
+        with trace.span('compute', sources=len(virtual)):
+            run_build(targets, options, fscache, time(), stdout, stderr)
+        elapsed = perf_counter_ns() - start
+
+        return stdout.getvalue(), stderr.getvalue(), elapsed
+
     @staticmethod
     def run(**kwargs: AnyDict) -> MypyAnalysis:
         stdout, _, _ = Module._run(**kwargs)
@@ -63,55 +203,123 @@ class Module(EngineModule):
             'messages': [json.loads(x) for x in objects]
         })
 
+    @staticmethod
+    def _get_mypy():
+        import mypy.version
+        return mypy.version.__file__
+
     @staticmethod
     def version() -> str:
+        return versions.get(Module.name, Module._get_mypy(), Module._version)
+
+    @staticmethod
+    def _version() -> str:
         output, _, _ = Module._run(version=True)
         return output.strip()
 
     @staticmethod
-    def report(**kwargs: AnyDict):
+    def _fields(message: Message) -> AnyDict:
+        severity = Module.SEVERITY.get(message.severity, None)
+        if not severity:
+            warnings.warn(f'unmapped severity {message.severity}')
+        
+        path = resolve_path(message.file)
+        return dict(
+            check_name=message.code,
+            description=message.message,
+            path=path,
+            begin_line=message.line,
+            begin_column=message.column+1,
+            end_line=message.line,
+            end_column=message.column+1,
+            severity=severity,
+        )
+
+    @staticmethod
+    def _issue(message: Message) -> gitlab.Issue:
+        return trusted.issue(**Module._fields(message))
+
+    @staticmethod
+    def _error(stderr: str, **kwargs: AnyDict) -> Exception:
+        __args = ' '.join(['mypy', *Module.arguments(**kwargs)])
+        return Exception(f'{__args} {stderr=!r}')
+
+    @staticmethod
+    def _iter_lines(stderr: io.StringIO, daemon: None|bool|Daemon = None, **kwargs: AnyDict) -> Iterator[str]:
+        if daemon or kwargs.get('pool', None) or kwargs.get('sources', None):
+            stdout, errors, _ = Module._run(daemon=daemon, **kwargs)
+            stderr.write(errors)
+            yield from stdout.splitlines()
+            return
+
+        import mypy.main as mypy
+
+        lines = LineQueue()
+        def target():
+            try:
+                mypy.main(
+                    args=Module.arguments(**kwargs),
+                    stdout=lines,
+                    stderr=stderr,
+                    clean_exit=True
+                )
+            except SystemExit: pass
+            finally:
+                lines.close()
+
+        # on the thread every in-process check shares, mypy not being re-entrant
+        EXECUTOR.submit(target)
+        yield from lines
+
+    @staticmethod
+    def iter_issues(**kwargs: AnyDict) -> Iterator[gitlab.Issue]:
+        # failures as `report` has them: output that isn't JSON, or errors and no output
+        stderr = io.StringIO()
+        failed, messages = False, 0
+        for line in Module._iter_lines(stderr, **kwargs):
+            if line.startswith('{'):
+                messages += 1
+                yield fingerprint_issue(Module._issue(Message.model_validate_json(line)))
+            elif line.strip():
+                failed = True
+
+        if failed or (not messages and stderr.getvalue().strip()):
+            raise Module._error(stderr.getvalue(), **kwargs)
+
+    @staticmethod
+    def report(columnar: bool = False, **kwargs: AnyDict):
+        """With `columnar`, the issues are filled into an `IssueTable` as they are converted."""
         now = datetime.now()
         stdout, stderr, elapsed = Module._run(**kwargs)
         objects = stdout.strip().split('\n')
 
         try:
-            analysis = Analysis.model_validate({
-                'messages': [json.loads(x) for x in objects if x]
-            })
+            with trace.span('parse'):
+                messages = [json.loads(x) for x in objects if x]
         except json.JSONDecodeError as je:
-            __args = ' '.join(Module.mypy.from_dict(kwargs).build())
-            raise Exception(f'{__args} {stderr=!r}') from je
-
-        issues = list[gitlab.Issue]()
-        for message in analysis.messages:
-            positions=issue.PositionRange(
-                begin=issue.LineColumnPosition(
-                    line=message.line,
-                    column=message.column+1
-                ),
-                end=issue.LineColumnPosition(
-                    line=message.line,
-                    column=message.column+1
-                )
-            )
-
-            location = issue.Location(
-                path=resolve_path(message.file),
-                lines=None,
-                positions=positions
-            )
-
-            severity = Module.SEVERITY.get(message.severity, None)
-            if not severity:
-                warnings.warn(f'unmapped severity {message.severity}')
-            
-            issues.append(gitlab.Issue(
-                check_name=message.code,
-                description=message.message,
-                location=location,
-                severity=severity,
-                fingerprint=fingerprint(message.model_dump_json(indent=0)),
-            ))
+            raise Module._error(stderr, **kwargs) from je
+        # e.g. invalid options: mypy exits before checking anything
+        if not messages and stderr.strip():
+            raise Module._error(stderr, **kwargs)
+
+        with trace.span('validate'):
+            analysis = Analysis.model_validate({'messages': messages})
+        issues: list[gitlab.Issue] | IssueTable
+        if columnar:
+            with trace.span('convert'):
+                issues = IssueTable()
+                for message in analysis.messages:
+                    issues.append_row(**Module._fields(message))
+            with trace.span('fingerprint'):
+                fingerprint_table(issues)
+        else:
+            with trace.span('convert'):
+                issues = [
+                    Module._issue(message)
+                    for message in analysis.messages
+                ]
+            with trace.span('fingerprint'):
+                issues = [fingerprint_issue(x) for x in issues]
 
         return gitlab.Report(
             issues=issues,
@@ -120,6 +328,30 @@ class Module(EngineModule):
             emitter=Report.Emitter(name='mypy', version=Module.version())
         )
 
+    @staticmethod
+    async def arun(timeout: None|float = None, **kwargs: AnyDict) -> MypyAnalysis:
+        """
+        With a `timeout`, the check runs in a fresh process, killed when the
+        timeout expires (a `pool` isn't used then). dmypy checks are the
+        exception: the daemon finishes a check that timed out.
+        """
+        if timeout is not None and not kwargs.get('daemon', None):
+            return await _killable('run', timeout, {k: v for k, v in kwargs.items() if k != 'pool'})
+        loop = asyncio.get_running_loop()
+        call = functools.partial(Module.run, **kwargs)
+        executor = None if kwargs.get('pool', None) else EXECUTOR
+        return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+
+    @staticmethod
+    async def areport(timeout: None|float = None, **kwargs: AnyDict) -> gitlab.Report:
+        """Like `arun`, a check with a `timeout` is killed when it expires."""
+        if timeout is not None and not kwargs.get('daemon', None):
+            return await _killable('report', timeout, {k: v for k, v in kwargs.items() if k != 'pool'})
+        loop = asyncio.get_running_loop()
+        call = functools.partial(Module.report, **kwargs)
+        executor = None if kwargs.get('pool', None) else EXECUTOR
+        return await asyncio.wait_for(loop.run_in_executor(executor, call), timeout)
+
     REVEAL_TYPE_PATTERN = re.compile(
         r'Revealed type is "(.*)"'
     )
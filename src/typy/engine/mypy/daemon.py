@@ -0,0 +1,115 @@
+from pathlib import Path
+from time import perf_counter_ns
+import atexit
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+def _default_status_file() -> Path:
+    project = hashlib.sha1(os.getcwd().encode('utf8')).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f'typy-dmypy-{project}.json'
+
+class DaemonError(RuntimeError): ...
+
+class Daemon:
+    """
+    A mypy daemon (dmypy) owned by typy. Checks are sent over dmypy's IPC
+    channel from this process, so repeated checks only pay incremental time.
+    """
+    def __init__(
+        self,
+        status_file: None|str|Path = None,
+        flags: None|list[str] = None,
+        timeout: None|int = None,
+    ):
+        self.status_file = Path(status_file or _default_status_file())
+        self.flags = flags or []
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._owned = False
+
+    def _dmypy(self, *args: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            [sys.executable, '-m', 'mypy.dmypy', '--status-file', str(self.status_file), *args],
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def is_alive(self) -> bool:
+        from mypy.dmypy.client import is_running
+        return is_running(str(self.status_file))
+
+    def start(self):
+        with self._lock:
+            if self.is_alive():
+                return
+
+            # a stale status file (e.g. a crashed daemon) would make 'start' refuse
+            self._dmypy('kill')
+            self.status_file.unlink(missing_ok=True)
+
+            args = ['start']
+            if self.timeout is not None:
+                args.append(f'--timeout={self.timeout}')
+
+            result = self._dmypy(*args, '--', *self.flags)
+            if result.returncode != 0:
+                raise DaemonError(f'dmypy failed to start: {result.stderr or result.stdout}')
+
+            if not self._owned:
+                self._owned = True
+                atexit.register(self.stop)
+
+    def restart(self, args: list[str]):
+        with self._lock:
+            result = self._dmypy('restart', '--', *args)
+            if result.returncode != 0:
+                raise DaemonError(f'dmypy failed to restart: {result.stderr or result.stdout}')
+
+    def stop(self):
+        with self._lock:
+            if not self.is_alive():
+                return
+            if self._dmypy('stop').returncode != 0:
+                self._dmypy('kill')
+
+    def check(self, args: list[str]) -> tuple[str, str, int]:
+        from mypy.dmypy.client import request
+        from mypy.version import __version__
+
+        self.start()
+
+        start = perf_counter_ns()
+        response = request(str(self.status_file), 'run', version=__version__, args=args, export_types=False)
+
+        if 'restart' in response:
+            self.restart(args)
+            response = request(str(self.status_file), 'run', version=__version__, args=args, export_types=False)
+
+        elapsed = perf_counter_ns() - start
+
+        if 'error' in response:
+            raise DaemonError(response['error'])
+
+        return response.get('out', ''), response.get('err', ''), elapsed
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_: object):
+        self.stop()
+
+_default: None|Daemon = None
+_default_lock = threading.Lock()
+
+def default() -> Daemon:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Daemon()
+        return _default
@@ -0,0 +1,92 @@
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+import atexit
+import io
+import multiprocessing
+import os
+import threading
+
+from typy.utils.types import AnyDict
+
+def _warm(kwargs: AnyDict):
+    # imports mypy and checks an empty program, which loads (and caches) typeshed's builtins
+    import mypy.main
+    from .command import Module
+
+    try:
+        mypy.main.main(args=[*Module.arguments(**kwargs), '-c', 'pass'], stdout=io.StringIO(), stderr=io.StringIO(), clean_exit=True)
+    except SystemExit: pass
+
+def _ready() -> int:
+    return os.getpid()
+
+def _check(kwargs: AnyDict) -> tuple[str, str, int]:
+    from .command import Module
+    return Module._run(**kwargs)
+
+class Pool:
+    """
+    Warm worker processes for in-process mypy. mypy's globals aren't
+    re-entrant, so each worker runs one check at a time; checks in different
+    workers run concurrently. A worker is replaced after `max_tasks` checks,
+    bounding what mypy's module-level state can accumulate.
+    """
+    def __init__(
+        self,
+        size: None|int = None,
+        max_tasks: None|int = 100,
+        warmup: None|AnyDict = None,
+    ):
+        self.size = size or min(4, os.cpu_count() or 1)
+        self.max_tasks = max_tasks
+        # options for the warm-up check, e.g. the `follow_imports` real checks use
+        self.warmup = warmup or {}
+        self._executor: None|ProcessPoolExecutor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm,
+                    initargs=(self.warmup,),
+                    max_tasks_per_child=self.max_tasks,
+                )
+            return self._executor
+
+    def start(self):
+        """Starts and warms up every worker now rather than on the first checks."""
+        pool = self._pool()
+        wait([pool.submit(_ready) for _ in range(self.size)])
+
+    def submit(self, **kwargs: object) -> Future[tuple[str, str, int]]:
+        """Checks in a worker; the result is `Module._run`'s (stdout, stderr, elapsed)."""
+        return self._pool().submit(_check, kwargs)
+
+    def check(self, **kwargs: object) -> tuple[str, str, int]:
+        return self.submit(**kwargs).result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_: object):
+        self.shutdown()
+
+_default: None|Pool = None
+_default_lock = threading.Lock()
+
+def default() -> Pool:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Pool()
+            atexit.register(_default.shutdown)
+        return _default
@@ -0,0 +1,123 @@
+"""
+In-memory sources for engines that only read files. Sources are written under
+one scratch directory (on tmpfs where there is one), in a tree per distinct
+set of sources, so checking the same buffers again writes nothing and
+concurrent checks of different contents don't collide.
+"""
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+
+from typy.formats import gitlab, IssueTable
+from typy.formats.report import ReportBase
+from typy.utils.fingerprint import fingerprint_issue
+from typy.utils.path import resolve_path
+
+type Sources = Mapping[str|Path, str]
+
+def _tmpfs() -> str:
+    shm = '/dev/shm'
+    return shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+
+def _digest(sources: Mapping[str, str]) -> str:
+    h = blake2b(digest_size=12)
+    for path, text in sorted(sources.items()):
+        h.update(path.encode('utf8') + b'\0' + text.encode('utf8') + b'\0')
+    return h.hexdigest()
+
+class Overlay:
+    """
+    Writes sources keyed by virtual path into a scratch tree; `checkout`
+    maps the written files back to their (resolved) virtual paths. The
+    least recently used trees beyond `keep` are removed once unused.
+    """
+    def __init__(self, root: None|str|Path = None, keep: int = 8):
+        self._root = None if root is None else Path(root)
+        self.keep = keep
+        self._trees = OrderedDict[str, int]()
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        with self._lock:
+            if self._root is None:
+                # resolved, as the paths engines report are
+                self._root = Path(tempfile.mkdtemp(prefix='typy-overlay-', dir=_tmpfs())).resolve()
+                atexit.register(shutil.rmtree, self._root, True)
+            return self._root
+
+    @contextmanager
+    def checkout(self, sources: Sources) -> Iterator[dict[str, str]]:
+        """Yields {written file: virtual path} for `sources`, resolved like `files`."""
+        virtual = {resolve_path(path): text for path, text in sources.items()}
+        key = _digest(virtual)
+        tree = self.root / key
+
+        # virtual paths are absolute, so each lands at its own place in the tree
+        files = {str(tree / Path(path).relative_to(Path(path).anchor)): path for path in virtual}
+
+        with self._lock:
+            fresh = key not in self._trees
+            self._trees[key] = self._trees.get(key, 0) + 1
+            self._trees.move_to_end(key)
+            try:
+                if fresh:
+                    for file, path in files.items():
+                        Path(file).parent.mkdir(parents=True, exist_ok=True)
+                        Path(file).write_text(virtual[path], encoding='utf8')
+            except BaseException:
+                self._trees[key] -= 1
+                if not self._trees[key]:
+                    del self._trees[key]
+                raise
+
+        try:
+            yield files
+        finally:
+            self._release(key)
+
+    def _release(self, key: str):
+        with self._lock:
+            self._trees[key] -= 1
+            unused = [k for k, n in self._trees.items() if n == 0]
+            evicted = unused[:max(len(self._trees) - self.keep, 0)]
+            for k in evicted:
+                del self._trees[k]
+
+        for k in evicted:
+            shutil.rmtree(self.root / k, ignore_errors=True)
+
+    @staticmethod
+    def restore_issue[I: gitlab.Issue](issue: I, files: Mapping[str, str]) -> I:
+        """`issue`, moved back to its virtual path if it is in an overlay file."""
+        path = files.get(resolve_path(issue.location.path), None)
+        if path is None:
+            return issue
+        location = issue.location.model_copy(update={'path': path})
+        # fingerprints depend on the path
+        return fingerprint_issue(issue.model_copy(update={'location': location, 'fingerprint': None}))
+
+    @staticmethod
+    def restore[R: ReportBase](report: R, files: Mapping[str, str]) -> R:
+        issues = [Overlay.restore_issue(x, files) for x in report.issues]
+        if isinstance(report.issues, IssueTable):
+            table = IssueTable(report.issues.issue_type)
+            table.extend(issues)
+            return report.model_copy(update={'issues': table})
+        return report.model_copy(update={'issues': issues})
+
+    @staticmethod
+    def with_files(kwargs: dict[str, object], files: Mapping[str, str]) -> dict[str, object]:
+        """Engine arguments checking the overlay files along with any given `files`."""
+        given = kwargs.get('files', None) or []
+        assert isinstance(given, list)
+        return {**kwargs, 'files': [*given, *files]}
+
+overlay = Overlay()
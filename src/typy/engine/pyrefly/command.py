@@ -1,18 +1,23 @@
 from datetime import datetime, timedelta
+import asyncio
 from hashlib import sha1
 import re
 import warnings
 from argbuilder import Command, Field # pyright: ignore[reportMissingTypeStubs]
 from argbuilder.builder import NOT_SET # pyright: ignore[reportMissingTypeStubs]
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Literal, cast
 
-from typy.engine.base import EngineModule, RevealType
+from typy.engine.base import Capabilities, EngineModule, RevealType
+from typy.engine.version import versions
 from typy.utils.types import AnyDict
 from typy.utils.path import resolve_paths, resolve_path
-from .models import Analysis
-from typy.formats import gitlab, issue, report as Report
-from typy.utils import fingerprint, subprocess
+from .models import Analysis, Error
+from typy.formats import gitlab, issue, trusted, report as Report
+from typy.utils import subprocess, trace
+from typy.utils.fingerprint import fingerprint_issue
+from typy.utils.jsonstream import iter_array
 
 type PyreflyAnalysis = Analysis
 
@@ -21,6 +26,9 @@ def threads_param(x: None|int): return '' if x is None else f' {x}'
 type OutputFormat = Literal['min-text', 'full-text', 'json', 'github', 'omit-errors']
 
 class Module(EngineModule):
+    name = 'pyrefly'
+    capabilities = Capabilities(shardable=True, threads=True)
+
     SEVERITY: dict[str, issue.Severity] = {
         'info': 'info',
         'error': 'major'
@@ -41,11 +49,17 @@ class Module(EngineModule):
         return get_pyrefly_bin()
 
     @staticmethod
-    def _run(**kwargs: AnyDict):
-        pyrefly = Module._get_pyrefly()
+    def arguments(**kwargs: AnyDict) -> list[str]:
         args = Module.pyrefly().check.from_dict(kwargs)
-        cl_args = args.build(with_self=False)
-        cl_args = [pyrefly, 'check', *cl_args]
+        return args.build(with_self=False)
+
+    @staticmethod
+    def _argv(**kwargs: AnyDict) -> list[str]:
+        return [Module._get_pyrefly(), 'check', *Module.arguments(**kwargs)]
+
+    @staticmethod
+    def _run(**kwargs: AnyDict):
+        cl_args = Module._argv(**kwargs)
 
         return cast(
             'tuple[subprocess.CompletedProcess[bytes], int]',
@@ -58,6 +72,10 @@ class Module(EngineModule):
 
     @staticmethod
     def version():
+        return versions.get(Module.name, Module._get_pyrefly(), Module._version)
+
+    @staticmethod
+    def _version():
         cl_args = Module.pyrefly(version=True).build(with_self=True)
         assert cl_args[0] == 'pyrefly'
         cl_args[0] = Module._get_pyrefly()
@@ -73,46 +91,68 @@ class Module(EngineModule):
     @staticmethod
     def run(**kwargs: AnyDict) -> PyreflyAnalysis:
         result, _ = Module._run(**kwargs)
-        stdout = result.stdout.decode('utf8')
-        return Analysis.model_validate_json(stdout)
+        return Module._analysis(result)
+
+    @staticmethod
+    def _analysis(result: 'subprocess.CompletedProcess[bytes]') -> PyreflyAnalysis:
+        with trace.span('decode'):
+            stdout = result.stdout.decode('utf8')
+        # pydantic parses and validates in one pass
+        with trace.span('validate', parse=True):
+            return Analysis.model_validate_json(stdout)
+
+    @staticmethod
+    def _issue(error: Error) -> gitlab.Issue:
+        severity = Module.SEVERITY.get(error.severity, None)
+        if not severity:
+            warnings.warn(f'unmapped severity {error.severity}')
+
+        path = resolve_path(error.path)
+        return trusted.issue(
+            check_name=error.name,
+            description=error.description,
+            path=path,
+            begin_line=error.line,
+            begin_column=error.column,
+            end_line=error.line,
+            end_column=error.column,
+            severity=severity,
+        )
+
+    @staticmethod
+    def iter_issues(**kwargs: AnyDict) -> Iterator[gitlab.Issue]:
+        with subprocess.stream_stdout(Module._argv(**kwargs)) as stdout:
+            for x in iter_array(stdout, 'errors'):
+                yield fingerprint_issue(Module._issue(Error.model_validate(x)))
 
     @staticmethod
     def report(**kwargs: AnyDict) -> gitlab.Report:
         now = datetime.now()
         result, elapsed = Module._run(**kwargs)
-        stdout = result.stdout.decode('utf8')
-        analysis = Analysis.model_validate_json(stdout)
-        issues = list[gitlab.Issue]()
-
-        for error in analysis.errors:
-            severity = Module.SEVERITY.get(error.severity, None)
-            if not severity:
-                warnings.warn(f'unmapped severity {error.severity}')
-
-            positions=issue.PositionRange(
-                begin=issue.LineColumnPosition(
-                    line=error.line,
-                    column=error.column
-                ),
-                end=issue.LineColumnPosition(
-                    line=error.line,
-                    column=error.column
-                )
-            )
-
-            location = issue.Location(
-                path=resolve_path(error.path),
-                lines=None,
-                positions=positions
-            )
-
-            issues.append(gitlab.Issue(
-                check_name=error.name,
-                description=error.description,
-                severity=severity,
-                location=location,
-                fingerprint=fingerprint(error.model_dump_json(indent=0)),
-            ))
+        return Module._report(result, elapsed, now)
+
+    @staticmethod
+    async def arun(timeout: None|float = None, **kwargs: AnyDict) -> PyreflyAnalysis:
+        result, _ = await subprocess.atime_run(Module._argv(**kwargs), timeout)
+        return Module._analysis(result)
+
+    @staticmethod
+    async def areport(timeout: None|float = None, **kwargs: AnyDict) -> gitlab.Report:
+        now = datetime.now()
+        await asyncio.to_thread(Module.version)
+        result, elapsed = await subprocess.atime_run(Module._argv(**kwargs), timeout)
+        return Module._report(result, elapsed, now)
+
+    @staticmethod
+    def _report(result: 'subprocess.CompletedProcess[bytes]', elapsed: int, now: datetime) -> gitlab.Report:
+        analysis = Module._analysis(result)
+        with trace.span('convert'):
+            issues = [
+                Module._issue(error)
+                for error in analysis.errors
+            ]
+        with trace.span('fingerprint'):
+            issues = [fingerprint_issue(x) for x in issues]
 
         return gitlab.Report(
             issues=issues,
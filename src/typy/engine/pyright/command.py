@@ -1,17 +1,24 @@
-from datetime import timedelta
+from collections.abc import Iterator
+import asyncio
 import re
 from typing import Any, Concatenate, Generic, Literal, NamedTuple, ParamSpec, Callable, TypeVar, cast
 from pathlib import Path
 import warnings
 from argbuilder import Command, Field # pyright: ignore[reportMissingTypeStubs]
 import json
-from typy.engine.base import EngineModule, RevealType
-from typy.formats import gitlab, issue, report as Report
+from typy.engine.base import Capabilities, EngineModule, RevealType
+from typy.engine.lsp import LanguageServer
+from typy.engine.version import versions
+from typy.utils.types import AnyDict
+from typy.formats import gitlab, issue, trusted, report as Report
 from hashlib import sha1
-from typy.utils import fingerprint
+from typy.utils import trace
+from typy.utils.fingerprint import fingerprint_issue
 from typy.utils.path import resolve_path, resolve_paths
+from typy.utils import subprocess
+from typy.utils.jsonstream import iter_array
 
-from .models import Analysis
+from .models import Analysis, GeneralDiagnostic
 type PyrightAnalysis = Analysis
 
 P = ParamSpec('P')
@@ -72,6 +79,9 @@ def my_custom_model[T: type](x: T) -> T: return x
 from argbuilder.builder import NOT_SET # pyright: ignore[reportMissingTypeStubs]
 
 class Module(EngineModule):
+    name = 'pyright'
+    capabilities = Capabilities(daemon=True, threads=True)
+
     @my_custom_model
     class pyright(Command, Generic[P]):
         files: list[str|Path] = Field('{value}', resolve_paths)
@@ -101,26 +111,40 @@ class Module(EngineModule):
     }
 
     @staticmethod
-    def _run(**kwargs):
+    def arguments(**kwargs: Any) -> list[str]:
         args = Module.pyright.from_dict(kwargs)
-        cl_args = args.build(with_self=False)
+        return args.build(with_self=False)
+
+    @staticmethod
+    def _run(**kwargs):
+        cl_args = Module.arguments(**kwargs)
 
         import pyright.cli as pyright_cli
-        import subprocess
 
-        result = cast(
-            'subprocess.CompletedProcess[bytes]',
-            pyright_cli.run(
-            *cl_args,
-            text=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        ))
+        # spawn and compute can't be told apart: node runs inside pyright.cli
+        with trace.span('process'):
+            result = cast(
+                'subprocess.CompletedProcess[bytes]',
+                pyright_cli.run(
+                *cl_args,
+                text=False,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            ))
 
         return result
 
+    @staticmethod
+    def _get_pyright():
+        from pyright._utils import install_pyright
+        return install_pyright(('--outputjson',), quiet=True) / 'index.js'
+
     @staticmethod
     def version():
+        return versions.get(Module.name, Module._get_pyright(), Module._version)
+
+    @staticmethod
+    def _version():
         result = Module._run(version=True)
         stdout = result.stdout.decode('utf8')
         return stdout
@@ -133,53 +157,118 @@ class Module(EngineModule):
             raise TypeError(f"'run' takes 0 positional arguments but {argc} was given.")
         
         result = Module._run(**kwargs)
-        stdout = result.stdout.decode('utf8')
-        stdout = stdout.replace('\xa0', ' ')
-        data = json.loads(stdout)
-        return Analysis.model_validate(data)
+        return Module._analysis(result)
+
+    @staticmethod
+    def _analysis(result: 'subprocess.CompletedProcess[bytes]') -> PyrightAnalysis:
+        with trace.span('decode'):
+            stdout = result.stdout.decode('utf8')
+            stdout = stdout.replace('\xa0', ' ')
+        with trace.span('parse'):
+            data = json.loads(stdout)
+        with trace.span('validate'):
+            return Analysis.model_validate(data)
+
+    @staticmethod
+    def _issue(diagnostic: GeneralDiagnostic) -> gitlab.Issue:
+        check_name = diagnostic.rule or 'misc'
+        severity = Module.SEVERITY_MAP.get(diagnostic.severity, None)
+        if not severity:
+            warnings.warn(f'unmapped severity {diagnostic.severity}')
+        
+        # pyright positions are 0-based
+        start, end = diagnostic.range.start, diagnostic.range.end
+        path = resolve_path(diagnostic.file)
+        return trusted.issue(
+            check_name=check_name,
+            description=diagnostic.message,
+            path=path,
+            begin_line=start.line+1,
+            begin_column=start.character+1,
+            end_line=end.line+1,
+            end_column=end.character+1,
+            severity=severity,
+        )
+
+    @staticmethod
+    def _argv(**kwargs: Any) -> list[str]:
+        import sys
+        return [sys.executable, '-m', 'pyright', *Module.arguments(**kwargs)]
+
+    @staticmethod
+    @signature_of(pyright.__init__)
+    def iter_issues(**kwargs: Any) -> Iterator[gitlab.Issue]:
+        with subprocess.stream_stdout(Module._argv(**kwargs)) as stdout:
+            for x in iter_array(stdout, 'generalDiagnostics'):
+                assert isinstance(x, dict)
+                x['message'] = x['message'].replace('\xa0', ' ')
+                yield fingerprint_issue(Module._issue(GeneralDiagnostic.model_validate(x)))
 
     @staticmethod
     @signature_of(pyright.__init__)
     def report(**kwargs: Any):
-        result = Module.run(**kwargs)
-        issues = list[gitlab.Issue]()
-
-        for diagnostic in result.generalDiagnostics:
-            check_name = diagnostic.rule or 'misc'
-            severity = Module.SEVERITY_MAP.get(diagnostic.severity, None)
-            if not severity:
-                warnings.warn(f'unmapped severity {diagnostic.severity}')
-            
-            range = issue.PositionRange(
-                begin=issue.LineColumnPosition(
-                    line=diagnostic.range.start.line, 
-                    column=diagnostic.range.start.character
-                ),
-                end=issue.LineColumnPosition(
-                    line=diagnostic.range.end.line, 
-                    column=diagnostic.range.end.character,
-                )
-            )
-
-            issues.append(gitlab.Issue(
-                check_name=check_name,
-                description=diagnostic.message,
-                severity=severity,
-                fingerprint=fingerprint(diagnostic.model_dump_json(indent=0)),
-                location=issue.Location(
-                    path=str(diagnostic.file.resolve()),
-                    positions=range,
-                    lines=None, # TODO
-                )
-            ))
-        
+        return Module._report(Module.run(**kwargs))
+
+    @staticmethod
+    @signature_of(pyright.__init__)
+    async def arun(timeout: None|float = None, **kwargs: Any):
+        result, _ = await subprocess.atime_run(Module._argv(**kwargs), timeout)
+        return Module._analysis(result)
+
+    @staticmethod
+    @signature_of(pyright.__init__)
+    async def areport(timeout: None|float = None, **kwargs: Any):
+        await asyncio.to_thread(Module.version)
+        return Module._report(await Module.arun(timeout, **kwargs))
+
+    @staticmethod
+    def _report(result: PyrightAnalysis) -> gitlab.Report:
+        trace.record('compute', int(result.summary.timeInSec.total_seconds() * 1e9), reported=True)
+        with trace.span('convert'):
+            issues = [
+                Module._issue(diagnostic)
+                for diagnostic in result.generalDiagnostics
+            ]
+        with trace.span('fingerprint'):
+            issues = [fingerprint_issue(x) for x in issues]
+
         return gitlab.Report(
             issues=issues,
-            elapsed=timedelta(microseconds=result.summary.timeInSec.microseconds),
+            elapsed=result.summary.timeInSec,
             time=result.time,
             emitter=Report.Emitter(name='pyright', version=Module.version())
         )
 
+    LSP_SEVERITY: dict[int, str] = {
+        1: 'error',
+        2: 'warning',
+        3: 'information',
+        4: 'information',
+    }
+
+    @staticmethod
+    def _lsp_issue(path: Path, diagnostic: AnyDict) -> gitlab.Issue:
+        # published diagnostics carry the same data as --outputjson
+        return fingerprint_issue(Module._issue(GeneralDiagnostic(
+            file=path,
+            severity=Module.LSP_SEVERITY[diagnostic.get('severity', 1)],
+            message=diagnostic['message'],
+            range=diagnostic['range'],
+            rule=diagnostic.get('code', None),
+        )))
+
+    @staticmethod
+    def server(root: None|str|Path = None, settings: None|AnyDict = None) -> LanguageServer:
+        import sys
+        return LanguageServer(
+            name=Module.name,
+            command=[sys.executable, '-m', 'pyright.langserver', '--stdio'],
+            to_issue=Module._lsp_issue,
+            version=Module.version,
+            root=root,
+            settings=settings,
+        )
+
     REVEAL_TYPE_PATTERN = re.compile(
         r'Type of "(.*)" is "(.*)"'
     )
@@ -0,0 +1,120 @@
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING
+import importlib
+import threading
+
+if TYPE_CHECKING:
+    from typy.engine.base import Capabilities, EngineModule
+
+GROUP = 'typy.engines'
+
+BUILTIN: dict[str, str] = {
+    'ty': 'typy.engine.ty:Module',
+    'pyright': 'typy.engine.pyright:Module',
+    'pyrefly': 'typy.engine.pyrefly:Module',
+    'mypy': 'typy.engine.mypy:Module',
+}
+
+type Target = str | EntryPoint | type['EngineModule']
+
+class NoSuchEngine(ValueError):
+    def __init__(self, name: str, available: list[str]):
+        super().__init__(f"Engine '{name}' not found. Available engines: {available}")
+        self.name = name
+
+class Registry:
+    """
+    Engine modules by name. Besides the built-in engines, third-party packages
+    can declare theirs as entry points:
+
+        [project.entry-points."typy.engines"]
+        basedpyright = "typy_basedpyright:Module"
+
+    Nothing is imported until an engine is looked up with `get`.
+    """
+    def __init__(self, group: None|str = GROUP, builtin: dict[str, str] = BUILTIN):
+        self.group = group
+        self._targets = dict[str, Target](builtin)
+        self._modules = dict[str, type['EngineModule']]()
+        self._discovered = group is None
+        self._lock = threading.RLock()
+
+    def _discover(self):
+        with self._lock:
+            if self._discovered:
+                return
+            assert self.group is not None
+            for entry_point in entry_points(group=self.group):
+                # built-in and explicitly registered engines take precedence
+                self._targets.setdefault(entry_point.name, entry_point)
+            self._discovered = True
+
+    def register(self, name: str, target: Target):
+        """Adds (or replaces) an engine, given as an `module:attribute` path, entry point or class."""
+        with self._lock:
+            self._targets[name] = target
+            self._modules.pop(name, None)
+
+    def target(self, name: str) -> None|str|EntryPoint:
+        """
+        How another process can load engine `name`, e.g. a spawned worker that
+        only knows the built-in and installed engines; None for classes that
+        can't be imported by name (defined in a function or `__main__`).
+        """
+        with self._lock:
+            if name not in self._targets:
+                self._discover()
+            target = self._targets.get(name, None)
+        if isinstance(target, (str, EntryPoint)):
+            return target
+
+        module = self.get(name)
+        if module.__module__ == '__main__' or '.' in module.__qualname__:
+            return None
+        return f'{module.__module__}:{module.__qualname__}'
+
+    def names(self) -> list[str]:
+        self._discover()
+        return list(self._targets)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names()
+
+    def get(self, name: str) -> type['EngineModule']:
+        from typy.engine.base import EngineModule
+
+        if (module := self._modules.get(name, None)) is not None:
+            return module
+
+        with self._lock:
+            if name not in self._targets:
+                self._discover()
+            if (target := self._targets.get(name, None)) is None:
+                raise NoSuchEngine(name, list(self._targets))
+
+            match target:
+                case str():
+                    path, _, attribute = target.partition(':')
+                    module = getattr(importlib.import_module(path), attribute or 'Module')
+                case EntryPoint():
+                    module = target.load()
+                case _:
+                    module = target
+
+            if not (isinstance(module, type) and issubclass(module, EngineModule)):
+                raise TypeError(f'engine {name!r} is not an EngineModule subclass: {module!r}')
+
+            self._modules[name] = module
+            return module
+
+    def capabilities(self, name: str) -> 'Capabilities':
+        return self.get(name).capabilities
+
+    def select(self, names: None|list[str] = None, **required: bool) -> list[str]:
+        """Engines (of `names`, default all) whose capabilities match `required`, e.g. `shardable=True`."""
+        return [
+            name for name in (names or self.names())
+            if all(getattr(self.capabilities(name), k) == v for k, v in required.items())
+        ]
+
+registry = Registry()
@@ -0,0 +1,67 @@
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+import multiprocessing
+
+from typy.engine.cache import ReportCache
+from typy.engine.common import Engine, get
+from typy.engine.registry import EntryPoint, registry
+from typy.formats import gitlab
+
+def _report(name: Engine, kwargs: dict[str, object], target: None|str|EntryPoint = None) -> gitlab.Report:
+    # worker processes only know the engines registered at import time
+    if target is not None:
+        registry.register(name, target)
+    return get(name).report(**kwargs)
+
+def run_all(
+    files: list[str|Path],
+    engines: None|Iterable[Engine] = None,
+    max_workers: None|int = None,
+    cache: None|ReportCache = None,
+    **kwargs: object,
+) -> Iterator[gitlab.Report]:
+    """
+    Runs the engines concurrently, yielding each report as soon as it finishes.
+    In-process engines (mypy) are not re-entrant, so they run in a worker
+    process, unless registered as a class a worker can't import.
+    """
+    names = list(engines or registry.names())
+    modules = {name: get(name) for name in names}
+    kwargs = {**kwargs, 'files': files}
+
+    targets = {name: registry.target(name) for name in names}
+    in_process = [name for name in names if not modules[name].capabilities.parallelizable and targets[name] is not None]
+    processes = ProcessPoolExecutor(
+        max_workers=len(in_process),
+        mp_context=multiprocessing.get_context('spawn'),
+    ) if in_process else None
+
+    def submit(name: Engine) -> gitlab.Report:
+        key = None if cache is None else cache.key(modules[name], **kwargs)
+        if cache is not None and key is not None:
+            if (cached := cache.get(key)) is not None:
+                return cached
+
+        if processes and name in in_process:
+            result = processes.submit(_report, name, kwargs, targets[name]).result()
+        else:
+            result = _report(name, kwargs)
+
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        return result
+
+    threads = ThreadPoolExecutor(max_workers=max_workers or len(names) or 1)
+    try:
+        futures: list[Future[gitlab.Report]] = [
+            threads.submit(submit, name)
+            for name in names
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        threads.shutdown(wait=False, cancel_futures=True)
+        if processes:
+            processes.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,145 @@
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Literal
+import heapq
+import math
+import multiprocessing
+import os
+
+from pydantic import BaseModel, Field
+
+from typy.engine.base import EngineModule
+from typy.engine.registry import registry
+from typy.engine.runner import _report
+from typy.formats import gitlab
+from typy.utils.imports import clusters, import_graph
+from typy.utils.path import iter_python_files
+
+# keeps every shard's command line far below ARG_MAX
+MAX_ARGV_BYTES = 128 * 1024
+
+class Policy(BaseModel):
+    workers: int = Field(default_factory=lambda: os.cpu_count() or 1, ge=1)
+    shards: None|int = Field(None, ge=1)
+    # --threads for engines that parallelize internally (pyrefly, pyright);
+    # when unset, sharded engines split the cores evenly between shards
+    threads: None|int = Field(None, ge=0)
+    strategy: Literal['size', 'imports'] = 'size'
+    max_argv_bytes: int = MAX_ARGV_BYTES
+
+    def threads_per_shard(self, shards: int) -> None|int:
+        if self.threads is not None:
+            return self.threads
+        if shards <= 1:
+            return None
+        return max(1, (os.cpu_count() or 1) // min(shards, self.workers))
+
+def partition(
+    files: Iterable[str|Path],
+    shards: int,
+    strategy: Literal['size', 'imports'] = 'size',
+    max_argv_bytes: int = MAX_ARGV_BYTES,
+) -> list[list[Path]]:
+    """
+    Splits `files` into balanced shards (by total bytes). With the 'imports'
+    strategy, files connected through local imports always share a shard.
+    """
+    files = [file.resolve() for file in iter_python_files(files)]
+    if not files:
+        return []
+
+    if strategy == 'imports':
+        groups = clusters(import_graph(files))
+    else:
+        groups = [[file] for file in files]
+
+    argv_bytes = sum(len(str(file)) + 1 for file in files)
+    shards = max(shards, math.ceil(argv_bytes / max_argv_bytes))
+    shards = max(1, min(shards, len(groups)))
+
+    def weight(group: list[Path]) -> int:
+        return sum(file.stat().st_size for file in group)
+
+    # longest-processing-time first: heaviest group goes to the lightest shard
+    heap = [(0, i) for i in range(shards)]
+    result = [list[Path]() for _ in range(shards)]
+    for group in sorted(groups, key=weight, reverse=True):
+        size, i = heapq.heappop(heap)
+        result[i].extend(group)
+        heapq.heappush(heap, (size + weight(group), i))
+
+    return [sorted(shard) for shard in result if shard]
+
+def merge(reports: Iterable[gitlab.Report]) -> gitlab.Report:
+    """
+    Merges per-shard reports of one engine, deduplicating issues by fingerprint.
+    `elapsed` is the total engine time across shards, `timings` holds the
+    spans of every shard.
+    """
+    reports = list(reports)
+    if not reports:
+        raise ValueError('at least one report is required')
+
+    seen = set[str]()
+    issues = list[gitlab.Issue]()
+    for report in reports:
+        for issue in report.issues:
+            if issue.fingerprint is not None:
+                if issue.fingerprint in seen:
+                    continue
+                seen.add(issue.fingerprint)
+            issues.append(issue)
+
+    return gitlab.Report(
+        issues=issues,
+        elapsed=sum((report.elapsed for report in reports), timedelta()),
+        time=min(report.time for report in reports),
+        emitter=reports[0].emitter,
+        timings=[span for report in reports for span in report.timings or ()] or None,
+    )
+
+def run_sharded(
+    engine: type[EngineModule],
+    files: list[str|Path],
+    policy: None|Policy = None,
+    **kwargs: object,
+) -> gitlab.Report:
+    """
+    Checks `files` in shards across worker processes for engines whose per-file
+    results are independent, then merges the shard reports.
+    """
+    policy = policy or Policy()
+
+    if not engine.capabilities.shardable:
+        if engine.capabilities.threads and policy.threads is not None:
+            kwargs.setdefault('threads', policy.threads)
+        return engine.report(files=files, **kwargs)
+
+    shards = partition(files, policy.shards or policy.workers, policy.strategy, policy.max_argv_bytes)
+    if not shards:
+        return engine.report(files=files, **kwargs)
+
+    kwargs = {**engine.shard_options, **kwargs}
+    if engine.capabilities.threads and (threads := policy.threads_per_shard(len(shards))) is not None:
+        kwargs.setdefault('threads', threads)
+
+    workers = min(policy.workers, len(shards))
+    target = None if engine.capabilities.parallelizable else registry.target(engine.name)
+    executor: Executor = (
+        ThreadPoolExecutor(max_workers=workers) if engine.capabilities.parallelizable else
+        ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) if target is not None else
+        # not importable by a worker, and not re-entrant
+        ThreadPoolExecutor(max_workers=1)
+    )
+
+    with executor:
+        reports = list(executor.map(
+            _report,
+            [engine.name] * len(shards),
+            [{**kwargs, 'files': shard} for shard in shards],
+            [target] * len(shards),
+        ))
+
+    return merge(reports)
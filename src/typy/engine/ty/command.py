@@ -1,16 +1,28 @@
 #import json
 from datetime import datetime, timedelta
+import asyncio
 import json
+from collections.abc import Iterator
 from typing import Any, cast
 from argbuilder import Command, Field # pyright: ignore[reportMissingTypeStubs]
 from pathlib import Path
-from typy.engine.base import EngineModule, RevealType
+from typy.engine.base import Capabilities, EngineModule, RevealType
+from typy.engine.lsp import LanguageServer
+from typy.engine.version import versions
+from typy.formats import issue, trusted, IssueTable
+from typy.utils import trace
+from typy.utils.fingerprint import fingerprint_issue
+from typy.utils.types import AnyDict
 from typy.formats import gitlab, report as Report
 from typy.utils.path import resolve_paths
 from typy.utils import subprocess
+from typy.utils.jsonstream import iter_array
 import re
 
 class Module(EngineModule):
+    name = 'ty'
+    capabilities = Capabilities(daemon=True, shardable=True)
+
     class ty(Command):
         class check(Command):
             files: list[Path] = Field('{value}', resolve_paths)
@@ -27,6 +39,10 @@ class Module(EngineModule):
 
     @staticmethod
     def version():
+        return versions.get(Module.name, Module._get_ty(), Module._version)
+
+    @staticmethod
+    def _version():
         args = Module.ty().version().build(with_self=True)
         assert args[0] == 'ty'
         args[0] = Module._get_ty()
@@ -42,12 +58,17 @@ class Module(EngineModule):
         
 
     @staticmethod
-    def _run(**kwargs: Any):
+    def arguments(**kwargs: Any) -> list[str]:
         args = Module.ty().check.from_dict(kwargs)
-        cl_args = args.build(with_self=False)
+        return args.build(with_self=False)
+
+    @staticmethod
+    def _argv(**kwargs: Any) -> list[str]:
+        return [Module._get_ty(), 'check', *Module.arguments(**kwargs)]
 
-        ty = Module._get_ty()
-        cl_args = [ty, 'check', *cl_args]
+    @staticmethod
+    def _run(**kwargs: Any):
+        cl_args = Module._argv(**kwargs)
 
         result, elapsed = subprocess.time_run(
             cl_args,
@@ -60,36 +81,121 @@ class Module(EngineModule):
         return result, elapsed
 
     @staticmethod
-    def run(**kwargs: Any):
-        result, _ = Module._run(**kwargs)
-        stdout = result.stdout.decode('utf8')
-        stdout = stdout.replace('\xa0', ' ')
-        data = json.loads(stdout.strip())
-        return [
-            gitlab.Issue.model_validate(x)
-            for x in data
-        ]
+    def _parse(result: 'subprocess.CompletedProcess[bytes]') -> list[AnyDict]:
+        with trace.span('decode'):
+            stdout = result.stdout.decode('utf8')
+            stdout = stdout.replace('\xa0', ' ')
+        with trace.span('parse'):
+            return json.loads(stdout.strip())
+
+    @staticmethod
+    def _issues(result: 'subprocess.CompletedProcess[bytes]') -> list[gitlab.Issue]:
+        data = Module._parse(result)
+        with trace.span('validate'):
+            return [
+                gitlab.Issue.model_validate(x)
+                for x in data
+            ]
         #return gitlab.Report.model_validate_json(f'{{"issues":{stdout}}}')
 
     @staticmethod
-    def report(**kwargs: Any):
-        now = datetime.now()
-        result, elapsed = Module._run(**kwargs)
-        stdout = result.stdout.decode('utf8')
-        stdout = stdout.replace('\xa0', ' ')
-        data = json.loads(stdout.strip())
-        issues = [
-            gitlab.Issue.model_validate(x)
-            for x in data
-        ]
-        
+    def _table(result: 'subprocess.CompletedProcess[bytes]') -> IssueTable:
+        data = Module._parse(result)
+        # `ty check` reports line/column positions only
+        with trace.span('convert'):
+            table = IssueTable()
+            for x in data:
+                location = x['location']
+                begin, end = location['positions']['begin'], location['positions']['end']
+                table.append_row(
+                    check_name=x['check_name'],
+                    description=x['description'],
+                    path=location['path'],
+                    begin_line=begin['line'],
+                    begin_column=begin['column'],
+                    end_line=end['line'],
+                    end_column=end['column'],
+                    severity=x.get('severity', None),
+                    fingerprint=x.get('fingerprint', None),
+                )
+            return table
+
+    @staticmethod
+    def _report(result: 'subprocess.CompletedProcess[bytes]', elapsed: int, now: datetime, columnar: bool = False) -> gitlab.Report:
         return gitlab.Report(
-            issues=issues,
+            issues=Module._table(result) if columnar else Module._issues(result),
             elapsed=timedelta(microseconds=elapsed / 1000),
             time=now,
             emitter=Report.Emitter(name='ty', version=Module.version())
         )
 
+    @staticmethod
+    def run(**kwargs: Any):
+        result, _ = Module._run(**kwargs)
+        return Module._issues(result)
+
+    @staticmethod
+    def report(columnar: bool = False, **kwargs: Any):
+        """With `columnar`, the issues are filled into an `IssueTable` straight from ty's JSON."""
+        now = datetime.now()
+        result, elapsed = Module._run(**kwargs)
+        return Module._report(result, elapsed, now, columnar)
+
+    @staticmethod
+    async def arun(timeout: None|float = None, **kwargs: Any):
+        result, _ = await subprocess.atime_run(Module._argv(**kwargs), timeout)
+        return Module._issues(result)
+
+    @staticmethod
+    async def areport(timeout: None|float = None, columnar: bool = False, **kwargs: Any):
+        now = datetime.now()
+        await asyncio.to_thread(Module.version)
+        result, elapsed = await subprocess.atime_run(Module._argv(**kwargs), timeout)
+        return Module._report(result, elapsed, now, columnar)
+
+    @staticmethod
+    def iter_issues(**kwargs: Any) -> Iterator[gitlab.Issue]:
+        with subprocess.stream_stdout(Module._argv(**kwargs)) as stdout:
+            for x in iter_array(stdout):
+                assert isinstance(x, dict)
+                x['description'] = x['description'].replace('\xa0', ' ')
+                yield gitlab.Issue.model_validate(x)
+
+    LSP_SEVERITY: dict[int, issue.Severity] = {
+        1: 'major',
+        2: 'minor',
+        3: 'info',
+    }
+
+    @staticmethod
+    def _lsp_issue(path: Path, diagnostic: AnyDict) -> gitlab.Issue:
+        # match `ty check --output-format=gitlab`: 1-based columns, code-prefixed descriptions
+        start, end = diagnostic['range']['start'], diagnostic['range']['end']
+        check_name = str(diagnostic.get('code', None) or 'ty')
+
+        description = f'{check_name}: {diagnostic["message"]}'
+        return fingerprint_issue(trusted.issue(
+            check_name=check_name,
+            description=description,
+            path=str(path),
+            begin_line=start['line']+1,
+            begin_column=start['character']+1,
+            end_line=end['line']+1,
+            end_column=end['character']+1,
+            severity=Module.LSP_SEVERITY.get(diagnostic.get('severity', 1), None),
+        ))
+
+    @staticmethod
+    def server(root: None|str|Path = None, settings: None|AnyDict = None) -> LanguageServer:
+        return LanguageServer(
+            name=Module.name,
+            command=[Module._get_ty(), 'server'],
+            to_issue=Module._lsp_issue,
+            version=Module.version,
+            root=root,
+            settings=settings,
+        )
+
     REVEAL_TYPE_PATTERN = re.compile(
         r'Revealed type: `(.*)`'
     )
@@ -0,0 +1,80 @@
+from collections.abc import Callable
+from pathlib import Path
+import json
+import os
+import threading
+
+from typy.utils import trace
+
+type Key = tuple[str, str, int]
+
+class VersionCache:
+    """
+    Engine versions resolved once per (engine, binary, mtime), so reinstalling
+    an engine invalidates its entry. Optionally persisted to a JSON file.
+    """
+    def __init__(self, path: None|str|Path = None):
+        self.path = None if path is None else Path(path)
+        self._versions = dict[Key, str]()
+        self._lock = threading.Lock()
+
+        if self.path:
+            self._load()
+
+    @staticmethod
+    def key(name: str, binary: str|Path) -> Key:
+        binary = Path(binary).resolve()
+        return (name, str(binary), binary.stat().st_mtime_ns)
+
+    def get(self, name: str, binary: str|Path, resolve: Callable[[], str]) -> str:
+        with trace.span('version', engine=name):
+            return self._get(name, binary, resolve)
+
+    def _get(self, name: str, binary: str|Path, resolve: Callable[[], str]) -> str:
+        key = VersionCache.key(name, binary)
+
+        with self._lock:
+            cached = self._versions.get(key, None)
+        if cached is not None:
+            return cached
+
+        version = resolve()
+
+        with self._lock:
+            self._versions[key] = version
+            if self.path:
+                self._save()
+
+        return version
+
+    def persist(self, path: str|Path):
+        with self._lock:
+            self.path = Path(path)
+            self._load()
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            if self.path:
+                self._save()
+
+    def _load(self):
+        assert self.path
+        try:
+            entries = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        for name, binary, mtime, version in entries:
+            self._versions.setdefault((name, binary, mtime), version)
+
+    def _save(self):
+        assert self.path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        entries = [[*key, version] for key, version in self._versions.items()]
+        tmp = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_text(json.dumps(entries))
+        os.replace(tmp, self.path)
+
+versions = VersionCache(os.environ.get('TYPY_VERSION_CACHE', None))
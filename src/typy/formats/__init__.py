@@ -1,8 +1,22 @@
+from typing import TYPE_CHECKING
+
+from typy.utils.lazy import lazy
 from . import (
     issue,
     gitlab,
     standard,
     codeclimate,
     report,
+    sarif,
+    stream,
+    table,
+    trusted,
 )
-from .report import ReportBase
\ No newline at end of file
+from .report import ReportBase
+from .table import IssueTable
+
+if TYPE_CHECKING:
+    from . import render
+
+# rendering pulls in rich
+__getattr__, __dir__ = lazy(__name__, {'render': '.render'})
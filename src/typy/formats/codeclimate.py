@@ -3,4 +3,19 @@ from .report import ReportBase
 
 Issue = issue.Codeclimate
 
-class Report(ReportBase[Issue]): ...
\ No newline at end of file
+class Report(ReportBase[Issue]): ...
+
+def from_gitlab(x: issue.GitlabIssue, categories: None|list[issue.Category] = None) -> Issue:
+    return Issue.model_construct(
+        check_name=x.check_name,
+        description=x.description,
+        location=x.location,
+        severity=x.severity,
+        fingerprint=x.fingerprint,
+        categories=categories or ['Bug Risk'],
+        content=None,
+        trace=None,
+        type='issue',
+        other_locations=None,
+        remediation_points=None,
+    )
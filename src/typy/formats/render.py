@@ -0,0 +1,206 @@
+from collections.abc import Iterable, Iterator, Sequence
+from functools import cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from rich.console import Console, ConsoleOptions
+from rich.segment import Segment
+from rich.style import Style
+from rich.syntax import Syntax
+
+from typy.utils.source import SourceCache, sources
+from .issue import GitlabIssue, LineColumnPosition
+from .table import LINE_COLUMN, IssueTable
+
+if TYPE_CHECKING:
+    from pygments.lexer import Lexer
+
+class Row(NamedTuple):
+    path: str
+    check_name: str
+    description: str
+    # 1-based, None when the issue has no line/column positions
+    line: None|int
+    column: None|int
+    end_line: None|int
+    end_column: None|int
+
+def rows(issues: Iterable[GitlabIssue] | IssueTable) -> Iterator[Row]:
+    if isinstance(issues, IssueTable):
+        # straight from the columns, without materializing issue views
+        for i in range(len(issues)):
+            if issues.kinds[i] == LINE_COLUMN:
+                span = (issues.begin_lines[i], issues.begin_columns[i], issues.end_lines[i], issues.end_columns[i])
+            else:
+                span = (None, None, None, None)
+            yield Row(issues.path(i), issues.check_name(i), issues.descriptions[i], *span)
+        return
+
+    for issue in issues:
+        positions = issue.location.positions
+        if (
+            positions is not None
+            and isinstance(positions.begin, LineColumnPosition)
+            and isinstance(positions.end, LineColumnPosition)
+        ):
+            span = (positions.begin.line, positions.begin.column, positions.end.line, positions.end.column)
+        else:
+            span = (None, None, None, None)
+        yield Row(issue.location.path, issue.check_name, issue.description, *span)
+
+@cache
+def _lexer() -> 'Lexer':
+    from pygments.lexers import PythonLexer
+    return PythonLexer()
+
+@cache
+def console(no_color: bool = False) -> Console:
+    return Console(no_color=no_color)
+
+def _context(row: Row, count: int) -> range:
+    # one line of context before the issue
+    assert row.line is not None and row.end_line is not None
+    return range(max(row.line - 1, 1), min(row.end_line, count) + 1)
+
+def _caret(row: Row, line: str, highlight_char: str) -> str:
+    assert row.column is not None and row.end_column is not None
+    width = row.end_column - row.column if row.end_line == row.line else len(line) - row.column + 1
+    indent = ''.join(c if c == '\t' else ' ' for c in line[:row.column - 1])
+    return indent + highlight_char * max(width, 1)
+
+def _group(issues: Iterable[Row]) -> dict[str, list[Row]]:
+    files = dict[str, list[Row]]()
+    for row in issues:
+        files.setdefault(row.path, []).append(row)
+    return files
+
+def _lines(source_cache: SourceCache, path: str) -> Sequence[str]:
+    try:
+        return source_cache.lines(path)
+    except OSError:
+        return []
+
+def render_plain(
+    path: str,
+    issues: Sequence[Row],
+    srclines: Sequence[str],
+    emitter: None|str,
+    highlight_char: str = '^',
+) -> str:
+    out = list[str]()
+    for row in issues:
+        if row.line is None or row.line > len(srclines):
+            out.append(f'>>> {path}')
+        else:
+            out.append(f'>>> {path}:{row.line}:{row.column}')
+            context = _context(row, len(srclines))
+            out.extend(f'| {srclines[n-1]}' for n in context if srclines[n-1])
+            out.append(f'| {_caret(row, srclines[context[-1]-1], highlight_char)}')
+        if emitter is not None:
+            out.append(f'{emitter}[{row.check_name}]: {row.description}')
+            out.append('')
+    return '\n'.join(out)
+
+@cache
+def _styles(code_theme: str) -> dict[object, Style]:
+    return {}
+
+def _token_style(code_theme: str, token_type: object) -> Style:
+    styles = _styles(code_theme)
+    if (style := styles.get(token_type, None)) is None:
+        # foreground only, like `Syntax(..., background_color='default')`
+        themed = Syntax.get_theme(code_theme).get_style_for_token(token_type) # type: ignore
+        style = styles[token_type] = Style(color=themed.color, bold=themed.bold, italic=themed.italic, underline=themed.underline)
+    return style
+
+LOCATION, GUTTER, CARET, DESCRIPTION = Style(color='blue'), Style(color='black'), Style(bold=True, color='red'), Style(color='red')
+
+class FileIssues:
+    """
+    All issues of one file as a single renderable. The source lines they
+    need are lexed in one pass and emitted as segments, skipping Rich's
+    text layout. Without an `emitter` descriptions are left out.
+    """
+    def __init__(
+        self,
+        path: str,
+        issues: Sequence[Row],
+        srclines: Sequence[str],
+        emitter: None|str,
+        highlight_char: str = '^',
+        code_theme: str = 'one-dark',
+    ):
+        self.path = path
+        self.issues = issues
+        self.srclines = srclines
+        self.emitter = emitter
+        self.highlight_char = highlight_char
+        self.code_theme = code_theme
+
+    def _highlight(self) -> dict[int, list[Segment]]:
+        count = len(self.srclines)
+        needed = sorted({
+            n for row in self.issues
+            if row.line is not None and row.line <= count
+            for n in _context(row, count)
+        })
+        if not needed:
+            return {}
+
+        lines = [list[Segment]()]
+        for token_type, value in _lexer().get_tokens('\n'.join(self.srclines[n-1] for n in needed)):
+            style = _token_style(self.code_theme, token_type)
+            first, *rest = value.split('\n')
+            if first:
+                lines[-1].append(Segment(first, style))
+            for part in rest:
+                lines.append([Segment(part, style)] if part else [])
+        return dict(zip(needed, lines))
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> Iterator[Segment]:
+        srclines = self.srclines
+        highlighted = self._highlight()
+        newline = Segment.line()
+
+        for row in self.issues:
+            if row.line is None or row.line > len(srclines):
+                yield Segment(f'>>> {self.path}', LOCATION)
+                yield newline
+            else:
+                yield Segment(f'>>> {self.path}:{row.line}:{row.column}', LOCATION)
+                yield newline
+                context = _context(row, len(srclines))
+                for n in context:
+                    if srclines[n-1]:
+                        yield Segment('| ', GUTTER)
+                        yield from highlighted.get(n, None) or [Segment(srclines[n-1])]
+                        yield newline
+                yield Segment('| ', GUTTER)
+                yield Segment(_caret(row, srclines[context[-1]-1], self.highlight_char), CARET)
+                yield newline
+            if self.emitter is not None:
+                yield Segment(f'{self.emitter}[{row.check_name}]: {row.description}', DESCRIPTION)
+                yield newline
+                yield newline
+
+def render(
+    issues: Iterable[GitlabIssue] | IssueTable,
+    emitter: str,
+    console: Console,
+    plain: None|bool = None,
+    highlight_char: str = '^',
+    code_theme: str = 'one-dark',
+    source_cache: None|SourceCache = None,
+):
+    """
+    Prints issues grouped by file, one write per file. `plain` (the default
+    when the console is not a terminal) skips Rich entirely.
+    """
+    source_cache = source_cache or sources
+    plain = not console.is_terminal if plain is None else plain
+
+    for path, file_issues in _group(rows(issues)).items():
+        srclines = _lines(source_cache, path)
+        if plain:
+            console.file.write(render_plain(path, file_issues, srclines, emitter, highlight_char) + '\n')
+        else:
+            console.print(FileIssues(path, file_issues, srclines, emitter, highlight_char, code_theme), end='', crop=False)
@@ -1,59 +1,48 @@
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from pydantic import BaseModel
 
-from rich.console import Console
 from . import issue
-from pathlib import Path
-import tokenize
+from .table import IssueTable
+from typy.utils.trace import Span
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from typy.utils.source import SourceCache
 
 class Emitter(BaseModel):
     name: str
     version: None|str
 
 class ReportBase[T: issue.GitlabIssue](BaseModel):
-    issues: list[T]
+    # a columnar IssueTable materializes (non-validated) issue views on access
+    issues: list[T] | IssueTable
     elapsed: timedelta
     time: datetime
     emitter: Emitter
+    # typy-side stages of producing the report, see `typy.utils.trace`
+    timings: None|list[Span] = None
+
+    def columnar(self):
+        if isinstance(self.issues, IssueTable):
+            return self
+        return self.model_copy(update={'issues': IssueTable.from_issues(self.issues)})
 
     def show(
             self, 
             rich_colors: bool = True, 
-            console: None|Console = None,
-            code_theme: str = 'one-dark'
+            console: 'None|Console' = None,
+            code_theme: str = 'one-dark',
+            source_cache: 'None|SourceCache' = None,
+            plain: None|bool = None,
     ):
-        console = console or Console(no_color=not rich_colors)
-
-        CACHE = dict[str, list[str]]()
-        def get_file_lines(file: str|Path):
-            file = Path(file).resolve()
-
-            cached = CACHE.get(str(file), None)
-            if cached:
-                result = cached
-
-            with tokenize.open(str(file)) as f:
-                src = f.read()
-            
-            result = CACHE[str(file)] = src.splitlines()
-
-            return result
-
-        for i,issue in enumerate(self.issues):
-            is_last_issue = i == len(self.issues)-1
-
-            srclines = get_file_lines(issue.location.path)
-
-            issue.show(
-                srclines=srclines,
-                console=console,
-                code_theme=code_theme
-            )
-
-            issue_description = f'{self.emitter.name}\\[{issue.check_name}]: {issue.description}'
-            issue_description = f'[red]{issue_description}[/red]'
-
-            console.print(issue_description)
-
-            if not is_last_issue:
-                console.print()
\ No newline at end of file
+        from . import render
+
+        render.render(
+            self.issues,
+            emitter=self.emitter.name,
+            console=console or render.console(no_color=not rich_colors),
+            plain=plain,
+            code_theme=code_theme,
+            source_cache=source_cache,
+        )
\ No newline at end of file
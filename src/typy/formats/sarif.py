@@ -0,0 +1,64 @@
+# https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+
+from pathlib import Path
+from typing import Any
+
+from . import issue
+from .report import Emitter
+
+VERSION = '2.1.0'
+SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+LEVEL: dict[None|issue.Severity, str] = {
+    None: 'warning',
+    'info': 'note',
+    'minor': 'warning',
+    'major': 'error',
+    'critical': 'error',
+    'blocker': 'error',
+}
+
+def uri(path: str) -> str:
+    p = Path(path)
+    return p.as_uri() if p.is_absolute() else p.as_posix()
+
+def region(location: issue.Location) -> dict[str, int]:
+    if location.lines is not None:
+        return {'startLine': location.lines.begin, 'endLine': location.lines.end}
+
+    positions = location.positions
+    assert positions is not None
+    begin, end = positions.begin, positions.end
+    if isinstance(begin, issue.LineColumnPosition) and isinstance(end, issue.LineColumnPosition):
+        return {'startLine': begin.line, 'startColumn': begin.column, 'endLine': end.line, 'endColumn': end.column}
+    if isinstance(begin, issue.OffsetPosition) and isinstance(end, issue.OffsetPosition):
+        return {'charOffset': begin.offset, 'charLength': max(end.offset - begin.offset, 0)}
+    return {}
+
+def result(x: issue.GitlabIssue) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        'ruleId': x.check_name,
+        'level': LEVEL.get(x.severity, 'warning'),
+        'message': {'text': x.description},
+        'locations': [{
+            'physicalLocation': {
+                'artifactLocation': {'uri': uri(x.location.path)},
+                'region': region(x.location),
+            },
+        }],
+    }
+    if x.fingerprint is not None:
+        data['partialFingerprints'] = {'typy/v1': x.fingerprint}
+    return data
+
+def tool(emitter: Emitter) -> dict[str, Any]:
+    driver: dict[str, Any] = {'name': emitter.name}
+    if emitter.version is not None:
+        driver['version'] = emitter.version
+    return {'driver': driver}
+
+def run(emitter: Emitter, issues: list[issue.GitlabIssue]) -> dict[str, Any]:
+    return {'tool': tool(emitter), 'results': [result(x) for x in issues]}
+
+def log(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    return {'$schema': SCHEMA, 'version': VERSION, 'runs': runs}
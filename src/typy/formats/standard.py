@@ -3,4 +3,16 @@ from .report import ReportBase
 
 Issue = issue.BaseIssue
 
-class Report(ReportBase[Issue]): ...
\ No newline at end of file
+class Report(ReportBase[Issue]): ...
+
+def from_gitlab(x: issue.GitlabIssue, categories: None|list[issue.Category] = None) -> Issue:
+    return Issue.model_construct(
+        check_name=x.check_name,
+        description=x.description,
+        location=x.location,
+        severity=x.severity,
+        fingerprint=x.fingerprint,
+        categories=categories or ['Bug Risk'],
+        content=None,
+        trace=None,
+    )
@@ -0,0 +1,203 @@
+"""
+Writers serializing issues one at a time as an iterator yields them, so
+memory stays bounded by the write buffer however many issues there are.
+They write to a binary or text stream (e.g. `sys.stdout`) or a file
+descriptor.
+"""
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from typing import IO, Any, cast
+import codecs
+import io
+import json
+import os
+
+from . import codeclimate, issue, sarif, standard
+from .report import Emitter
+
+type Output = int | IO[bytes] | IO[str]
+
+BUFFER = 1 << 16
+
+def _dumps(x: Any) -> bytes:
+    return json.dumps(x, ensure_ascii=False, separators=(',', ':')).encode('utf8')
+
+def _json(x: Any) -> bytes:
+    # what `model_dump_json` does, minus building the str
+    return x.__pydantic_serializer__.to_json(x)
+
+class _Binary:
+    def __init__(self, out: IO[bytes]):
+        self.out = out
+
+    def write(self, data: bytes):
+        self.out.write(data)
+
+    def flush(self):
+        self.out.flush()
+
+class _Text:
+    def __init__(self, out: IO[str]):
+        self.out = out
+
+    def write(self, data: bytes):
+        self.out.write(data.decode('utf8'))
+
+    def flush(self):
+        self.out.flush()
+
+def _is_binary(out: IO[bytes] | IO[str]) -> bool:
+    return isinstance(out, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(out, 'mode', '')
+
+def _is_utf8(out: IO[str]) -> bool:
+    encoding = getattr(out, 'encoding', None)
+    try:
+        return encoding is not None and codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+class Writer(ABC):
+    """
+    Writes one document: `begin`, any number of `write` calls (one per
+    engine) and `end`; used as a context manager, `begin` and `end` are
+    called for you. `close` flushes, and only closes what the writer opened.
+    Streams not known to be binary are written as text.
+    """
+    def __init__(self, out: Output):
+        self._opened: None|IO[bytes] = None
+        self._sink: _Binary|_Text
+        if isinstance(out, int):
+            self._opened = os.fdopen(out, 'wb', buffering=BUFFER, closefd=False)
+            self._sink = _Binary(self._opened)
+        elif _is_binary(out):
+            self._sink = _Binary(cast(IO[bytes], out))
+        else:
+            text = cast(IO[str], out)
+            buffer: None|IO[bytes] = getattr(text, 'buffer', None)
+            if buffer is not None and _is_utf8(text):
+                # UTF-8 text streams with a binary buffer (like sys.stdout) are written through it
+                text.flush()
+                self._sink = _Binary(buffer)
+            else:
+                self._sink = _Text(text)
+        self.count = 0
+
+    def _write(self, data: bytes):
+        self._sink.write(data)
+
+    def begin(self): ...
+
+    @abstractmethod
+    def write(self, issues: Iterable[issue.GitlabIssue], emitter: None|Emitter = None) -> int:
+        """Writes `issues` (of the engine `emitter`), returning how many there were."""
+
+    def end(self): ...
+
+    def flush(self):
+        self._sink.flush()
+
+    def close(self):
+        self.flush()
+        if self._opened is not None:
+            self._opened.close()
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, error: None|type[BaseException], *_: object):
+        if error is None:
+            self.end()
+        self.close()
+
+class JsonlWriter(Writer):
+    """One gitlab issue per line, with the `engine` that reported it."""
+    def write(self, issues: Iterable[issue.GitlabIssue], emitter: None|Emitter = None) -> int:
+        prefix = b'{' if emitter is None else b'{"engine":' + _dumps(emitter.name) + b','
+        n = 0
+        for x in issues:
+            self._write(prefix + _json(x)[1:] + b'\n')
+            n += 1
+        self.count += n
+        return n
+
+class ArrayWriter(Writer):
+    """A JSON array of `convert(issue)`, across all `write` calls."""
+    def __init__(self, out: Output, convert: Callable[[issue.GitlabIssue], Any] = lambda x: x):
+        super().__init__(out)
+        self.convert = convert
+
+    def begin(self):
+        self._write(b'[')
+
+    def write(self, issues: Iterable[issue.GitlabIssue], emitter: None|Emitter = None) -> int:
+        n = 0
+        for x in issues:
+            self._write((b',' if self.count + n else b'') + _json(self.convert(x)))
+            n += 1
+        self.count += n
+        return n
+
+    def end(self):
+        self._write(b']\n')
+
+class GitlabWriter(ArrayWriter):
+    """A GitLab code quality report."""
+
+class StandardWriter(ArrayWriter):
+    def __init__(self, out: Output):
+        super().__init__(out, standard.from_gitlab)
+
+class CodeclimateWriter(Writer):
+    """
+    Codeclimate issues as the engine spec has them: JSON documents each
+    followed by a NUL byte. With `array`, a JSON array instead.
+    """
+    def __init__(self, out: Output, array: bool = False):
+        super().__init__(out)
+        self.array = array
+
+    def begin(self):
+        if self.array:
+            self._write(b'[')
+
+    def write(self, issues: Iterable[issue.GitlabIssue], emitter: None|Emitter = None) -> int:
+        n = 0
+        for x in issues:
+            data = _json(codeclimate.from_gitlab(x))
+            if self.array:
+                self._write((b',' if self.count + n else b'') + data)
+            else:
+                self._write(data + b'\0')
+            n += 1
+        self.count += n
+        return n
+
+    def end(self):
+        if self.array:
+            self._write(b']\n')
+
+class SarifWriter(Writer):
+    """A SARIF log with one run per `write` call."""
+    def __init__(self, out: Output):
+        super().__init__(out)
+        self._runs = 0
+
+    def begin(self):
+        self._write(b'{"$schema":' + _dumps(sarif.SCHEMA) + b',"version":' + _dumps(sarif.VERSION) + b',"runs":[')
+
+    def write(self, issues: Iterable[issue.GitlabIssue], emitter: None|Emitter = None) -> int:
+        emitter = emitter or Emitter(name='typy', version=None)
+        self._write((b',' if self._runs else b'') + b'{"tool":' + _dumps(sarif.tool(emitter)) + b',"results":[')
+        self._runs += 1
+
+        n = 0
+        for x in issues:
+            self._write((b',' if n else b'') + _dumps(sarif.result(x)))
+            n += 1
+        self._write(b']}')
+        self.count += n
+        return n
+
+    def end(self):
+        self._write(b']}\n')
@@ -0,0 +1,228 @@
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, overload
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
+from .issue import (
+    GitlabIssue,
+    LineColumnPosition,
+    LineRange,
+    Location,
+    OffsetPosition,
+    PositionRange,
+    Severity,
+)
+
+SEVERITIES: tuple[None|Severity, ...] = (None, 'info', 'minor', 'major', 'critical', 'blocker')
+SEVERITY_CODES: dict[None|Severity, int] = {severity: code for code, severity in enumerate(SEVERITIES)}
+
+# how a row's begin/end columns are to be read back
+LINE_COLUMN, LINES, OFFSETS = 0, 1, 2
+
+class _Interned:
+    __slots__ = ('values', 'index')
+
+    def __init__(self):
+        self.values = list[str]()
+        self.index = dict[str, int]()
+
+    def __call__(self, value: str) -> int:
+        if (i := self.index.get(value, None)) is None:
+            i = self.index[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+class IssueTable(Sequence[GitlabIssue]):
+    """
+    Columnar storage for gitlab issues: paths and check names are interned,
+    positions, severities and fingerprints live in typed arrays. Indexing
+    materializes a (non-validated) view of a row, of the class of the issues
+    appended; fields subclasses add to `GitlabIssue` are kept per row as is.
+    """
+    def __init__(self, issue_type: type[GitlabIssue] = GitlabIssue):
+        self.issue_type = issue_type
+        self._extra_fields = tuple(issue_type.model_fields.keys() - GitlabIssue.model_fields.keys())
+        self._paths = _Interned()
+        self._checks = _Interned()
+        self.path_ids = array('I')
+        self.check_ids = array('I')
+        self.descriptions = list[str]()
+        self.kinds = array('B')
+        self.begin_lines = array('Q')
+        self.begin_columns = array('I')
+        self.end_lines = array('Q')
+        self.end_columns = array('I')
+        self.severities = array('B')
+        self.fingerprints = array('Q')
+        # fingerprints that are not a canonical u64 hex string
+        self._odd_fingerprints = dict[int, None|str]()
+        # subclass fields of each row, if `issue_type` has any
+        self.extras = list[dict[str, Any]]()
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[GitlabIssue]) -> 'IssueTable':
+        issues = iter(issues)
+        first = next(issues, None)
+        table = cls(GitlabIssue if first is None else type(first))
+        if first is not None:
+            table.append(first)
+        for issue in issues:
+            table.append(issue)
+        return table
+
+    @property
+    def paths(self) -> list[str]:
+        return self._paths.values
+
+    @property
+    def check_names(self) -> list[str]:
+        return self._checks.values
+
+    def append_row(
+        self,
+        check_name: str,
+        description: str,
+        path: str,
+        begin_line: int,
+        begin_column: int,
+        end_line: int,
+        end_column: int,
+        severity: None|Severity = None,
+        fingerprint: None|str = None,
+        kind: int = LINE_COLUMN,
+    ):
+        row = len(self.descriptions)
+        self.path_ids.append(self._paths(path))
+        self.check_ids.append(self._checks(check_name))
+        self.descriptions.append(description)
+        self.kinds.append(kind)
+        self.begin_lines.append(begin_line)
+        self.begin_columns.append(begin_column)
+        self.end_lines.append(end_line)
+        self.end_columns.append(end_column)
+        self.severities.append(SEVERITY_CODES[severity])
+
+        packed = 0
+        try:
+            if fingerprint is not None and len(fingerprint) <= 16:
+                packed = int(fingerprint, 16)
+        except ValueError:
+            pass
+        if fingerprint is None or format(packed, 'x') != fingerprint:
+            self._odd_fingerprints[row] = fingerprint
+        self.fingerprints.append(packed)
+
+    def append(self, issue: GitlabIssue):
+        if type(issue) is not self.issue_type:
+            raise ValueError(f'cannot append a {type(issue).__name__} to a table of {self.issue_type.__name__}')
+        location = issue.location
+        kind, begin_line, begin_column, end_line, end_column = LINES, 0, 0, 0, 0
+
+        if location.lines is not None:
+            begin_line, end_line = location.lines.begin, location.lines.end
+        elif location.positions is not None:
+            begin, end = location.positions.begin, location.positions.end
+            if isinstance(begin, LineColumnPosition) and isinstance(end, LineColumnPosition):
+                kind = LINE_COLUMN
+                begin_line, begin_column = begin.line, begin.column
+                end_line, end_column = end.line, end.column
+            elif isinstance(begin, OffsetPosition) and isinstance(end, OffsetPosition):
+                kind = OFFSETS
+                begin_line, end_line = begin.offset, end.offset
+            else:
+                raise ValueError(f'mixed position kinds are not supported: {location.positions!r}')
+
+        self.append_row(
+            check_name=issue.check_name,
+            description=issue.description,
+            path=location.path,
+            begin_line=begin_line,
+            begin_column=begin_column,
+            end_line=end_line,
+            end_column=end_column,
+            severity=issue.severity,
+            fingerprint=issue.fingerprint,
+            kind=kind,
+        )
+        if self._extra_fields:
+            self.extras.append({name: getattr(issue, name) for name in self._extra_fields})
+
+    def extend(self, issues: Iterable[GitlabIssue]):
+        for issue in issues:
+            self.append(issue)
+
+    def path(self, i: int) -> str:
+        return self._paths.values[self.path_ids[i]]
+
+    def check_name(self, i: int) -> str:
+        return self._checks.values[self.check_ids[i]]
+
+    def severity(self, i: int) -> None|Severity:
+        return SEVERITIES[self.severities[i]]
+
+    def fingerprint(self, i: int) -> None|str:
+        if i in self._odd_fingerprints:
+            return self._odd_fingerprints[i]
+        return format(self.fingerprints[i], 'x')
+
+    def location(self, i: int) -> Location:
+        path = self.path(i)
+        match self.kinds[i]:
+            case 0: # LINE_COLUMN
+                positions = PositionRange.model_construct(
+                    begin=LineColumnPosition.model_construct(line=self.begin_lines[i], column=self.begin_columns[i]),
+                    end=LineColumnPosition.model_construct(line=self.end_lines[i], column=self.end_columns[i]),
+                )
+                return Location.model_construct(path=path, lines=None, positions=positions)
+            case 1: # LINES
+                lines = LineRange.model_construct(begin=self.begin_lines[i], end=self.end_lines[i])
+                return Location.model_construct(path=path, lines=lines, positions=None)
+            case _: # OFFSETS
+                positions = PositionRange.model_construct(
+                    begin=OffsetPosition.model_construct(offset=self.begin_lines[i]),
+                    end=OffsetPosition.model_construct(offset=self.end_lines[i]),
+                )
+                return Location.model_construct(path=path, lines=None, positions=positions)
+
+    def _view(self, i: int) -> GitlabIssue:
+        return self.issue_type.model_construct(
+            check_name=self.check_name(i),
+            description=self.descriptions[i],
+            location=self.location(i),
+            severity=self.severity(i),
+            fingerprint=self.fingerprint(i),
+            **(self.extras[i] if self._extra_fields else {}),
+        )
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    @overload
+    def __getitem__(self, i: int) -> GitlabIssue: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[GitlabIssue]: ...
+    def __getitem__(self, i: int|slice) -> GitlabIssue|list[GitlabIssue]:
+        if isinstance(i, slice):
+            return [self._view(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('issue index out of range')
+        return self._view(i)
+
+    def __iter__(self) -> Iterator[GitlabIssue]:
+        return map(self._view, range(len(self)))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({len(self)} issues, {len(self.paths)} paths)'
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda table: [issue.model_dump(mode='json') for issue in table],
+            ),
+        )
@@ -0,0 +1,43 @@
+"""
+Issue construction for output typy produces itself. Building the nested
+models one by one runs a validator call per model; here each issue is
+validated once, as a single dict, through a shared `TypeAdapter`.
+"""
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from .issue import GitlabIssue, Severity
+
+_issue = TypeAdapter(GitlabIssue)
+
+def issue(
+    check_name: str,
+    description: str,
+    path: str,
+    begin_line: int,
+    begin_column: int,
+    end_line: int,
+    end_column: int,
+    severity: None|Severity = None,
+    fingerprint: None|str = None,
+) -> GitlabIssue:
+    """A 1-based line/column issue."""
+    return _issue.validate_python({
+        'check_name': check_name,
+        'description': description,
+        'severity': severity,
+        'fingerprint': fingerprint,
+        'location': {
+            'path': path,
+            'positions': {
+                'begin': {'line': begin_line, 'column': begin_column},
+                'end': {'line': end_line, 'column': end_column},
+            },
+        },
+    })
+
+def extend[I: GitlabIssue](cls: type[I], issue: GitlabIssue, **fields: Any) -> I:
+    """`issue` as a `cls`, a GitlabIssue subclass adding `fields`."""
+    # the nested models are already valid instances and pass through as they are
+    return cls.model_validate({**dict(issue), **fields})
@@ -0,0 +1,95 @@
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import os
+import tempfile
+import threading
+
+from typy.engine.base import RevealType
+from typy.engine.common import Engine, get
+from typy.engine.registry import registry
+from typy.engine.runner import run_all
+from typy.formats import issue
+from typy.utils.path import resolve_path
+
+_lanes = set[int]()
+_lanes_lock = threading.Lock()
+
+@contextmanager
+def _lane() -> Iterator[int]:
+    # the lowest lane no concurrent call holds, so sequential calls keep reusing lane 0
+    with _lanes_lock:
+        lane = min(set(range(len(_lanes) + 1)) - _lanes)
+        _lanes.add(lane)
+    try:
+        yield lane
+    finally:
+        with _lanes_lock:
+            _lanes.discard(lane)
+
+def reveal_types(
+    snippets: list[str],
+    engines: None|Iterable[Engine] = None,
+    max_workers: None|int = None,
+) -> list[dict[str, list[RevealType]]]:
+    """
+    Checks every snippet with a single invocation per engine, returning the
+    revealed types of each snippet per engine, in line order.
+    """
+    names = list(engines or registry.names())
+    results = [
+        {name: list[RevealType]() for name in names}
+        for _ in snippets
+    ]
+
+    with _lane() as lane:
+        _check(snippets, names, max_workers, lane, results)
+
+    for result in results:
+        for reveal_types in result.values():
+            reveal_types.sort(key=lambda x: x.line or 0)
+
+    return results
+
+def _check(
+    snippets: list[str],
+    names: list[Engine],
+    max_workers: None|int,
+    lane: int,
+    results: list[dict[str, list[RevealType]]],
+):
+    # mypy's incremental cache is keyed on module names and replays cached
+    # messages with the path they were first seen at, so snippets keep a
+    # stable path per (process, lane, index) instead of living in a fresh
+    # tempdir; concurrent calls hold different lanes
+    workspace = Path(tempfile.gettempdir(), 'typy-reveal').resolve()
+    workspace.mkdir(exist_ok=True)
+
+    index = dict[str, int]()
+    for i, snippet in enumerate(snippets):
+        path = workspace / f'snippet_{os.getpid()}_{lane}_{i}.py'
+        path.write_text(snippet, encoding='utf8')
+        index[str(path)] = i
+
+    files = [Path(file) for file in index]
+    try:
+        for report in run_all(files=files, engines=names, max_workers=max_workers):
+            engine = get(report.emitter.name)
+
+            for x in report.issues:
+                reveal_type = engine.parse_reveal_type(x.description)
+                if reveal_type is None:
+                    continue
+
+                i = index.get(resolve_path(x.location.path), None)
+                if i is None:
+                    continue
+
+                positions = x.location.positions
+                if positions and isinstance(positions.begin, issue.LineColumnPosition):
+                    reveal_type.line = positions.begin.line
+
+                results[i][engine.name].append(reveal_type)
+    finally:
+        for file in files:
+            file.unlink(missing_ok=True)
@@ -1,3 +1,15 @@
-from . import subprocess
-from . import path
-from .fingerprint import fingerprint
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from .lazy import lazy
+# eager: importing the `fingerprint` submodule would otherwise bind the module,
+# not the function, as `typy.utils.fingerprint`
+from .fingerprint import fingerprint, semantic_fingerprint
+
+if TYPE_CHECKING:
+    from . import path, subprocess, trace
+
+__getattr__, __dir__ = lazy(__name__, {
+    'path': '.path',
+    'subprocess': '.subprocess',
+    'trace': '.trace',
+})
@@ -1,6 +1,15 @@
+from collections.abc import Sequence
+from hashlib import blake2b
+from pathlib import Path
+from typing import TYPE_CHECKING
 import hashlib
+import os
 import struct
 
+if TYPE_CHECKING:
+    from typy.formats.issue import GitlabIssue
+    from typy.formats.table import IssueTable
+
 # Adapted from 
 # https://github.com/astral-sh/ruff/blob/8d4d782e16b126d89a2a6d43bdcaa5450d67b804/crates/ruff_db/src/diagnostic/render/gitlab.rs#L158
 def fingerprint(string: str, salt: int = 0):
@@ -10,4 +19,106 @@ def fingerprint(string: str, salt: int = 0):
     m.update(string.encode('utf8'))
     # take first 8 bytes and turn into a hex string (same shape as Rust's "{:x}" for a u64)
     val = int.from_bytes(m.digest()[:8], 'little')
-    return format(val, 'x')
\ No newline at end of file
+    return format(val, 'x')
+
+def normalize_message(message: str) -> str:
+    return ' '.join(message.replace('\xa0', ' ').split())
+
+def _digest(*fields: object) -> int:
+    data = '\0'.join('' if x is None else str(x) for x in fields).encode('utf8')
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little')
+
+def semantic_fingerprint(
+    check_name: str,
+    path: str,
+    message: str,
+    line: None|int = None,
+    column: None|int = None,
+    content: None|str = None,
+    salt: int = 0,
+) -> str:
+    """
+    Fingerprint of what an issue says rather than how an engine serialized it.
+    Without `line`/`column` and with the (stripped) content of the enclosing
+    line instead, it survives edits that only move the issue around.
+    """
+    return format(_digest(salt, check_name, path, normalize_message(message), line, column, content), 'x')
+
+def fingerprint_issue[I: 'GitlabIssue'](issue: I) -> I:
+    """Fills in a missing semantic fingerprint of a line/column issue, in place."""
+    if issue.fingerprint is None and issue.location.positions is not None:
+        begin = issue.location.positions.begin
+        line, column = getattr(begin, 'line', None), getattr(begin, 'column', None)
+        issue.fingerprint = semantic_fingerprint(issue.check_name, issue.location.path, issue.description, line, column)
+    return issue
+
+def _lines(path: str) -> Sequence[str]:
+    from typy.utils.source import sources
+
+    try:
+        return sources.lines(path)
+    except OSError:
+        return []
+
+class ShiftResistant:
+    """
+    Shift-resistant fingerprints of issues: the content of their line instead
+    of where it is. Identical issues on identical lines are told apart by a
+    salt, in order of appearance, so use one instance per set of issues.
+    Paths under `root` are hashed relative to it, so the fingerprints don't
+    depend on where the project is checked out.
+    """
+    def __init__(self, root: None|str|Path = None):
+        self._root = None if root is None else os.path.join(Path(root).resolve(), '')
+        self._files = dict[str, Sequence[str]]()
+        self._seen = set[int]()
+
+    def _name(self, path: str) -> str:
+        if self._root is not None and path.startswith(self._root):
+            return Path(path[len(self._root):]).as_posix()
+        return path
+
+    def digest(self, check_name: str, path: str, message: str, line: None|int) -> int:
+        if (lines := self._files.get(path, None)) is None:
+            lines = self._files[path] = _lines(path)
+        content = lines[line-1].strip() if line is not None and 0 < line <= len(lines) else None
+
+        salt, name = 0, self._name(path)
+        while (value := _digest(salt, check_name, name, message, None, None, content)) in self._seen:
+            salt += 1
+        self._seen.add(value)
+        return value
+
+    def __call__(self, issue: 'GitlabIssue') -> str:
+        location = issue.location
+        line = None
+        if location.positions is not None:
+            line = getattr(location.positions.begin, 'line', None)
+        elif location.lines is not None:
+            line = location.lines.begin
+        return format(self.digest(issue.check_name, location.path, normalize_message(issue.description), line), 'x')
+
+def fingerprint_table(table: 'IssueTable', shift_resistant: bool = False) -> 'IssueTable':
+    """
+    Recomputes every fingerprint of `table` in place. With `shift_resistant`,
+    each source file is read once and the fingerprints are `ShiftResistant`'s.
+    """
+    from typy.formats.table import LINE_COLUMN, OFFSETS
+
+    salted = ShiftResistant()
+    paths, checks = table.paths, table.check_names
+
+    for i in range(len(table)):
+        path, check_name = paths[table.path_ids[i]], checks[table.check_ids[i]]
+        message = normalize_message(table.descriptions[i])
+
+        if not shift_resistant:
+            column = table.begin_columns[i] if table.kinds[i] == LINE_COLUMN else None
+            table.fingerprints[i] = _digest(0, check_name, path, message, table.begin_lines[i], column, None)
+        else:
+            line = table.begin_lines[i] if table.kinds[i] != OFFSETS else None
+            table.fingerprints[i] = salted.digest(check_name, path, message, line)
+
+        table._odd_fingerprints.pop(i, None)
+
+    return table
@@ -0,0 +1,132 @@
+from collections.abc import Callable, Iterable
+from pathlib import Path
+import ast
+
+type ImportGraph = dict[Path, set[Path]]
+
+def module_name(path: Path) -> str:
+    path = path.resolve()
+    parts = [] if path.stem == '__init__' else [path.stem]
+
+    parent = path.parent
+    while (parent / '__init__.py').exists():
+        parts.insert(0, parent.name)
+        parent = parent.parent
+
+    return '.'.join(parts)
+
+def imported_modules(path: Path) -> set[str]:
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (SyntaxError, ValueError, OSError):
+        return set()
+
+    package = module_name(path)
+    if path.stem != '__init__':
+        package = package.rpartition('.')[0]
+
+    result = set[str]()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            result.update(alias.name for alias in node.names)
+
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                anchor = package.split('.') if package else []
+                anchor = anchor[:len(anchor) - (node.level - 1)]
+                base = '.'.join(filter(None, [*anchor, base]))
+
+            if base:
+                result.add(base)
+            # `from pkg import mod` may import a submodule
+            result.update(f'{base}.{alias.name}' if base else alias.name for alias in node.names)
+
+    return result
+
+def import_graph(files: Iterable[Path], imports: Callable[[Path], set[str]] = imported_modules) -> ImportGraph:
+    """
+    Edges from each file to the files among `files` it imports. `imports`
+    gives the modules a file imports, e.g. from a cache of parsed files.
+    """
+    files = [Path(file).resolve() for file in files]
+    modules = {module_name(file): file for file in files}
+
+    graph: ImportGraph = {file: set() for file in files}
+    for file in files:
+        for name in imports(file):
+            # importing a.b.c also imports a and a.b
+            while name:
+                if (target := modules.get(name, None)) and target != file:
+                    graph[file].add(target)
+                name = name.rpartition('.')[0]
+
+    return graph
+
+def _root(path: Path) -> Path:
+    # the directory `module_name(path)` is relative to
+    return path.parents[module_name(path).count('.') + (path.stem == '__init__')]
+
+def _find(root: Path, name: str) -> None|Path:
+    base = root.joinpath(*name.split('.'))
+    for candidate in (base.with_name(f'{base.name}.pyi'), base.with_name(f'{base.name}.py'), base / '__init__.pyi', base / '__init__.py'):
+        if candidate.is_file():
+            return candidate
+    return None
+
+def import_closure(files: Iterable[Path], imports: Callable[[Path], set[str]] = imported_modules) -> set[Path]:
+    """
+    `files` and every file they transitively import, looked up in the
+    directories their top-level packages are in (not in installed packages).
+    """
+    pending = [Path(file).resolve() for file in files]
+    roots = {_root(file) for file in pending}
+    result = set(pending)
+    while pending:
+        for name in imports(pending.pop()):
+            # importing a.b.c also imports a and a.b
+            while name:
+                for root in roots:
+                    if (target := _find(root, name)) and (target := target.resolve()) not in result:
+                        result.add(target)
+                        pending.append(target)
+                name = name.rpartition('.')[0]
+
+    return result
+
+def dependents(graph: ImportGraph, changed: Iterable[Path]) -> set[Path]:
+    """`changed` plus every file that transitively imports one of them."""
+    reverse: ImportGraph = {file: set() for file in graph}
+    for file, targets in graph.items():
+        for target in targets:
+            reverse[target].add(file)
+
+    result = {Path(file).resolve() for file in changed}
+    pending = list(result)
+    while pending:
+        for importer in reverse.get(pending.pop(), ()):
+            if importer not in result:
+                result.add(importer)
+                pending.append(importer)
+
+    return result
+
+def clusters(graph: ImportGraph) -> list[list[Path]]:
+    """Connected components of the (undirected) import graph."""
+    parent = {file: file for file in graph}
+
+    def find(x: Path) -> Path:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for file, targets in graph.items():
+        for target in targets:
+            parent[find(file)] = find(target)
+
+    components = dict[Path, list[Path]]()
+    for file in graph:
+        components.setdefault(find(file), []).append(file)
+
+    return list(components.values())
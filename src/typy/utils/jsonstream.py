@@ -0,0 +1,110 @@
+from collections.abc import Iterator
+from typing import TextIO
+import json
+
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',:]}'
+
+class JSONStreamError(ValueError): ...
+
+class _Reader:
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # compact only when reading, so consuming an element never copies the buffer
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise JSONStreamError('unexpected end of JSON stream')
+
+    def expect(self, char: str):
+        if (found := self.peek()) != char:
+            raise JSONStreamError(f'expected {char!r} at offset {self.pos}, found {found!r}')
+        self.pos += 1
+
+    def value(self) -> object:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a number cut by the chunk boundary decodes as a shorter number, so a
+            # value only counts once it is followed by a delimiter
+            if (end == len(self.buffer) or self.buffer[end] not in DELIMITERS) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self) -> Iterator[object]:
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+def iter_array(
+    stream: TextIO,
+    key: None|str = None,
+    chunk_size: int = 1 << 16,
+    members: None|dict[str, object] = None,
+    bare: bool = False,
+) -> Iterator[object]:
+    """
+    Incrementally yields the elements of a top-level JSON array, or of the
+    array stored under `key` in a top-level object, reading `stream` in chunks.
+    Members of that object read before `key` are stored in `members`. With
+    `bare`, a top-level array is accepted in place of the object.
+    """
+    reader = _Reader(stream, chunk_size)
+
+    if key is None or (bare and reader.peek() == '['):
+        yield from reader.array()
+        return
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+
+        if name == key:
+            yield from reader.array()
+            return
+
+        value = reader.value()
+        if members is not None:
+            members[str(name)] = value
+        if reader.peek() == '}':
+            return
+        reader.expect(',')
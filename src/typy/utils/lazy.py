@@ -0,0 +1,27 @@
+from collections.abc import Callable
+import importlib
+import sys
+
+def lazy(package: str, targets: dict[str, str]) -> tuple[Callable[[str], object], Callable[[], list[str]]]:
+    """
+    Module `__getattr__`/`__dir__` resolving `targets` on first access.
+    Targets are import paths, either `module` or `module:attribute`,
+    relative ones resolved against `package`.
+    """
+    def __getattr__(name: str) -> object:
+        if (target := targets.get(name, None)) is None:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+        module, _, attribute = target.partition(':')
+        value = importlib.import_module(module, package)
+        if attribute:
+            value = getattr(value, attribute)
+
+        # cache it, also over a subpackage of the same name set by the import
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*vars(sys.modules[package]), *targets})
+
+    return __getattr__, __dir__
@@ -1,7 +1,35 @@
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
 from pathlib import Path
+import os
+
+# engines report the same handful of paths over and over. Only paths that go
+# through a symlink are re-checked against their target's identity, so
+# retargeting one doesn't serve its old target; the rest skip the stat
+@lru_cache(maxsize=4096)
+def _resolve(cwd: str, x: str, identity: None|tuple[int, int] = None) -> str:
+    return str(Path(cwd, x).resolve())
+
+@lru_cache(maxsize=4096)
+def _linked(cwd: str, x: str) -> bool:
+    return _resolve(cwd, x) != os.path.normpath(os.path.join(cwd, x))
 
 def resolve_path(x: str|Path) -> str:
-    return str(Path(x).resolve())
+    cwd, x = os.getcwd(), str(x)
+    if not _linked(cwd, x):
+        return _resolve(cwd, x)
+    try:
+        stat = os.stat(os.path.join(cwd, x))
+    except OSError:
+        return str(Path(cwd, x).resolve())
+    return _resolve(cwd, x, (stat.st_dev, stat.st_ino))
 
 def resolve_paths(xs: list[Path]) -> str:
     return ' '.join(map(resolve_path, xs))
+
+def iter_python_files(xs: Iterable[str|Path]) -> Iterator[Path]:
+    for x in map(Path, xs):
+        if x.is_dir():
+            yield from sorted(y for y in x.rglob('*') if y.suffix in ('.py', '.pyi'))
+        else:
+            yield x
@@ -0,0 +1,114 @@
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import overload
+import io
+import os
+import threading
+import tokenize
+
+type Key = tuple[int, int]
+
+class SourceLines(Sequence[str]):
+    """
+    Lines of a source file, decoded on access from a line-offset index, so
+    slicing only decodes the lines asked for. Behaves like `str.splitlines()`
+    for `\\n` and `\\r\\n` line endings.
+    """
+    def __init__(self, data: bytes, encoding: str = 'utf-8'):
+        self.data = data
+        self.encoding = encoding
+        self.offsets = array('Q', [0])
+
+        find = data.find
+        pos = find(b'\n')
+        while pos != -1:
+            self.offsets.append(pos + 1)
+            pos = find(b'\n', pos + 1)
+        if self.offsets[-1] == len(data):
+            self.offsets.pop()
+
+    def _line(self, i: int) -> str:
+        end = self.offsets[i+1] if i+1 < len(self.offsets) else len(self.data)
+        line = self.data[self.offsets[i]:end]
+        if line.endswith(b'\n'):
+            line = line[:-2] if line.endswith(b'\r\n') else line[:-1]
+        return line.decode(self.encoding, errors='replace')
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+    def __getitem__(self, i: int|slice) -> str|list[str]:
+        if isinstance(i, slice):
+            return [self._line(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('line index out of range')
+        return self._line(i)
+
+def _encoding(data: bytes) -> str:
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data[:4096]).readline)
+    except SyntaxError:
+        return 'utf-8'
+    return encoding
+
+class SourceCache:
+    """
+    Source files shared across reports and engines. Files are read once and
+    re-read when their size or mtime changes; the least recently used ones
+    are dropped once `max_bytes` are held.
+    """
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict[str, tuple[Key, SourceLines]]()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def lines(self, path: str|Path) -> SourceLines:
+        path = str(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if (entry := self._entries.get(path, None)) is not None:
+                if entry[0] == key:
+                    self._entries.move_to_end(path)
+                    return entry[1]
+                self._drop(path)
+
+        # read, not mapped: a file truncated under a live mapping raises SIGBUS
+        # in whoever still holds lines of it
+        with open(path, 'rb') as f:
+            data = f.read()
+        lines = SourceLines(data, _encoding(data))
+
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            self._entries[path] = (key, lines)
+            self._size += stat.st_size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+
+        return lines
+
+    def _drop(self, path: str):
+        (_, size), _ = self._entries.pop(path)
+        self._size -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+sources = SourceCache()
@@ -1,9 +1,18 @@
 from typing import Any, ParamSpec, Callable, TypeVar
+from collections.abc import Iterator
+from contextlib import contextmanager
+import asyncio
+import io
+import os
+import signal
 import subprocess
+import tempfile
 from time import perf_counter_ns
 from subprocess import * # pyright: ignore[reportWildcardImportFromLibrary]
 from typing import cast
 
+from typy.utils import trace
+
 P = ParamSpec('P')
 R = TypeVar('R')
 
@@ -20,12 +29,100 @@ def time_call(*args, **kwargs):
     return result, elapsed
 
 @copy_signature(subprocess.run)
-def time_run(*args, **kwargs):
+def time_run(*args, input=None, timeout=None, check=False, capture_output=False, **kwargs):
+    # `subprocess.run`, split into the `spawn` and `compute` trace spans
+    if capture_output:
+        kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+
     start = perf_counter_ns()
-    result = subprocess.run(*args, **kwargs) # pyright: ignore[reportUnknownVariableType]
+    with trace.span('spawn'):
+        process = subprocess.Popen(*args, **kwargs) # pyright: ignore[reportUnknownVariableType]
+    with process, trace.span('compute'):
+        try:
+            stdout, stderr = process.communicate(input, timeout)
+        except BaseException:
+            process.kill()
+            raise
     result = cast(
         'subprocess.CompletedProcess[str] | subprocess.CompletedProcess[bytes]', 
-        result
+        subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
     )
     elapsed = perf_counter_ns() - start
-    return result, elapsed
\ No newline at end of file
+
+    if check:
+        result.check_returncode()
+    return result, elapsed
+
+# how long a process whose output couldn't be read gets to exit with its status
+EXIT_GRACE = 0.5
+
+@contextmanager
+def stream_stdout(args: list[str], encoding: str = 'utf8') -> Iterator[io.TextIOWrapper]:
+    """
+    Runs `args` with stdout exposed as a text stream while the process runs.
+    If the caller bails out early, the whole process group is killed. If
+    reading fails after the process exited with an error (e.g. bad arguments,
+    so there is no output to parse), that error is raised instead, as a
+    `CalledProcessError` carrying stderr.
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            start_new_session=True,
+        )
+        assert process.stdout
+
+        try:
+            with io.TextIOWrapper(process.stdout, encoding=encoding) as stdout:
+                yield stdout
+        except Exception as e:
+            exited = True
+            try:
+                # reading failed at the end of its output, the process is likely exiting
+                process.wait(EXIT_GRACE)
+            except subprocess.TimeoutExpired:
+                exited = False
+                os.killpg(process.pid, signal.SIGKILL)
+            if not exited or process.returncode == 0:
+                raise
+            stderr.seek(0)
+            error = subprocess.CalledProcessError(process.returncode, args, stderr=stderr.read())
+            error.add_note(f'stderr: {error.stderr.decode(encoding, errors="replace").strip()}')
+            raise error from e
+        except BaseException:
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGKILL)
+            raise
+        finally:
+            process.wait()
+
+
+async def atime_run(args: list[str], timeout: None|float = None):
+    """
+    Async counterpart of `time_run` capturing stdout/stderr as bytes. On
+    timeout or cancellation the whole process group is killed.
+    """
+    start = perf_counter_ns()
+    with trace.span('spawn'):
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+
+    try:
+        with trace.span('compute'):
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except BaseException:
+        if process.returncode is None:
+            os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+        raise
+
+    elapsed = perf_counter_ns() - start
+    assert process.returncode is not None
+    result = subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+    return result, elapsed
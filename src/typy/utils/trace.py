@@ -0,0 +1,176 @@
+"""
+Timing spans for the stages of typy's own work (spawning an engine, decoding
+and parsing its output, validating, fingerprinting, ...).
+
+Spans finished inside `collect()` are gathered into a list, which engines
+attach to their reports as `timings`; every span is also handed to the
+registered `sinks`. With neither, `span()` does nothing but yield.
+"""
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter_ns, time_ns
+from typing import Any, Protocol, TextIO
+import random
+import threading
+
+from pydantic import BaseModel
+
+type Attribute = str|int|float|bool
+
+class Span(BaseModel):
+    name: str
+    id: int
+    # id of the outermost span
+    trace: int
+    parent: None|int = None
+    start_unix_ns: int
+    duration_ns: int
+    attributes: dict[str, Attribute] = {}
+
+class Sink(Protocol):
+    def emit(self, span: Span) -> None: ...
+
+class MemorySink:
+    def __init__(self):
+        self.spans = list[Span]()
+
+    def emit(self, span: Span):
+        self.spans.append(span)
+
+class JsonlSink:
+    """One JSON object per finished span."""
+    def __init__(self, out: str|Path|TextIO):
+        self._owned = isinstance(out, (str, Path))
+        self.out = open(out, 'a', encoding='utf8') if isinstance(out, (str, Path)) else out
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span):
+        line = span.model_dump_json() + '\n'
+        with self._lock:
+            self.out.write(line)
+            self.out.flush()
+
+    def close(self):
+        if self._owned:
+            self.out.close()
+
+class OtlpSink:
+    """
+    Batches spans into OTLP/JSON `ExportTraceServiceRequest` payloads and
+    hands them to `export`, e.g. a POST to a collector's `/v1/traces`.
+    """
+    def __init__(self, export: Callable[[dict[str, Any]], None], service: str = 'typy', batch: int = 512):
+        self.export = export
+        self.service = service
+        self.batch = batch
+        self._spans = list[Span]()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _span(span: Span) -> dict[str, Any]:
+        def value(x: Attribute) -> dict[str, Any]:
+            match x:
+                case bool():
+                    return {'boolValue': x}
+                case int():
+                    return {'intValue': str(x)}
+                case float():
+                    return {'doubleValue': x}
+                case str():
+                    return {'stringValue': x}
+
+        return {
+            'traceId': format(span.trace, '032x'),
+            'spanId': format(span.id, '016x'),
+            'parentSpanId': '' if span.parent is None else format(span.parent, '016x'),
+            'name': span.name,
+            'kind': 1,
+            'startTimeUnixNano': str(span.start_unix_ns),
+            'endTimeUnixNano': str(span.start_unix_ns + span.duration_ns),
+            'attributes': [{'key': k, 'value': value(v)} for k, v in span.attributes.items()],
+        }
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service}}]},
+            'scopeSpans': [{'scope': {'name': 'typy'}, 'spans': [OtlpSink._span(x) for x in spans]}],
+        }]}
+
+    def emit(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) < self.batch:
+                return
+            spans, self._spans = self._spans, []
+        self.export(self.payload(spans))
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if spans:
+            self.export(self.payload(spans))
+
+sinks = list[Sink]()
+
+def _id() -> int:
+    # random, so spans recorded in worker processes don't collide
+    return random.getrandbits(63) | 1
+
+_collected = ContextVar[None|list[Span]]('typy_trace_collected', default=None)
+# (trace, span) ids of the innermost open span
+_open = ContextVar[None|tuple[int, int]]('typy_trace_open', default=None)
+
+def _emit(span: Span):
+    collected = _collected.get()
+    if collected is not None:
+        collected.append(span)
+    for sink in sinks:
+        sink.emit(span)
+
+@contextmanager
+def span(name: str, **attributes: Attribute) -> Iterator[None]:
+    if not sinks and _collected.get() is None:
+        yield
+        return
+
+    parent = _open.get()
+    id = _id()
+    trace = id if parent is None else parent[0]
+    token = _open.set((trace, id))
+    start_unix, start = time_ns(), perf_counter_ns()
+    try:
+        yield
+    finally:
+        duration = perf_counter_ns() - start
+        _open.reset(token)
+        _emit(Span(
+            name=name, id=id, trace=trace, parent=None if parent is None else parent[1],
+            start_unix_ns=start_unix, duration_ns=duration, attributes=attributes,
+        ))
+
+def record(name: str, duration_ns: int, **attributes: Attribute):
+    """A span measured elsewhere (e.g. reported by an engine), ending now."""
+    if not sinks and _collected.get() is None:
+        return
+
+    parent = _open.get()
+    id = _id()
+    _emit(Span(
+        name=name, id=id, trace=id if parent is None else parent[0], parent=None if parent is None else parent[1],
+        start_unix_ns=time_ns() - duration_ns, duration_ns=duration_ns, attributes=attributes,
+    ))
+
+@contextmanager
+def collect() -> Iterator[list[Span]]:
+    """Gathers the spans finished in this block; they also reach any enclosing `collect()`."""
+    outer = _collected.get()
+    spans = list[Span]()
+    token = _collected.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected.reset(token)
+        if outer is not None:
+            outer.extend(spans)
@@ -0,0 +1,133 @@
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import time
+
+from typy.engine.base import EngineModule
+from typy.engine.common import Engine, get
+from typy.engine.registry import registry
+from typy.formats import gitlab
+from typy.utils.imports import ImportGraph, dependents, import_graph, imported_modules
+from typy.utils.path import iter_python_files, resolve_path
+
+type Snapshot = dict[Path, tuple[int, int, bytes]]
+
+class Watcher:
+    """
+    Keeps the last report of every engine and re-checks only what changed:
+    shardable engines re-run on the changed files plus their reverse import
+    dependents and have the new issues spliced in by path; other engines
+    re-run in full whenever any input changed.
+    """
+    def __init__(
+        self,
+        files: list[str|Path],
+        engines: None|Iterable[Engine] = None,
+        **kwargs: object,
+    ):
+        self.files = files
+        self.engines = [get(name) for name in (engines or registry.names())]
+        self.kwargs = kwargs
+        self.reports = dict[str, gitlab.Report]()
+        self._snapshot: Snapshot = {}
+        self._graph: ImportGraph = {}
+        # modules each file imports, kept until the file changes
+        self._imports = dict[Path, set[str]]()
+
+    def _scan(self) -> Snapshot:
+        snapshot: Snapshot = {}
+        for file in iter_python_files(self.files):
+            file = file.resolve()
+            stat = file.stat()
+            previous = self._snapshot.get(file, None)
+
+            # only re-hash files whose stat changed
+            if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                snapshot[file] = previous
+                continue
+
+            with open(file, 'rb') as f:
+                digest = hashlib.file_digest(f, 'blake2b').digest()
+            snapshot[file] = (stat.st_mtime_ns, stat.st_size, digest)
+
+        return snapshot
+
+    def _options(self, engine: type[EngineModule]) -> dict[str, object]:
+        # shardable engines always run in their per-file mode, so that partial
+        # and full runs report the same issues
+        if engine.capabilities.shardable:
+            return {**engine.shard_options, **self.kwargs}
+        return self.kwargs
+
+    def _check(self, engine: type[EngineModule], stale: set[Path], current: set[Path]) -> gitlab.Report:
+        previous = self.reports.get(engine.name, None)
+        if previous is None or not engine.capabilities.shardable:
+            return engine.report(files=self.files, **self._options(engine))
+
+        targets = sorted(stale & current)
+        if not targets:
+            fresh = previous.model_copy(update={'issues': []})
+        else:
+            fresh = engine.report(files=targets, **self._options(engine))
+
+        stale_paths = {str(file) for file in stale}
+        kept = [
+            issue
+            for issue in previous.issues
+            if resolve_path(issue.location.path) not in stale_paths
+        ]
+
+        return fresh.model_copy(update={'issues': kept + list(fresh.issues)})
+
+    def _imported(self, file: Path) -> set[str]:
+        if (modules := self._imports.get(file, None)) is None:
+            modules = self._imports[file] = imported_modules(file)
+        return modules
+
+    def tick(self) -> dict[str, gitlab.Report]:
+        snapshot = self._scan()
+        changed = {
+            file
+            for file, (_, _, digest) in snapshot.items()
+            if (file not in self._snapshot) or (self._snapshot[file][2] != digest)
+        }
+        removed = set(self._snapshot) - set(snapshot)
+
+        if self.reports and not changed and not removed:
+            self._snapshot = snapshot
+            return self.reports
+
+        # relative imports resolve against package names, which change with `__init__.py` files
+        if any(file.name == '__init__.py' for file in changed | removed):
+            self._imports.clear()
+        for file in changed | removed:
+            self._imports.pop(file, None)
+        graph = import_graph(snapshot, self._imported)
+        # importers of a removed file are only visible in the previous graph
+        stale = dependents(graph, changed) | dependents(self._graph, removed)
+
+        with ThreadPoolExecutor(max_workers=len(self.engines) or 1) as executor:
+            reports = executor.map(
+                lambda engine: self._check(engine, stale, set(snapshot)),
+                self.engines,
+            )
+            self.reports = {
+                engine.name: report
+                for engine, report in zip(self.engines, reports)
+            }
+
+        self._snapshot = snapshot
+        self._graph = graph
+        return self.reports
+
+    def watch(self, interval: float = 0.5) -> Iterator[dict[str, gitlab.Report]]:
+        """Yields the reports once, then again every time an input changes."""
+        reports = self.tick()
+        yield reports
+
+        while True:
+            time.sleep(interval)
+            if (current := self.tick()) is not reports:
+                reports = current
+                yield reports
@@ -1,5 +1,7 @@
 from pathlib import Path
+import typy
 import typy.engine
+from typy.engine.cache import ReportCache
 import pytest
 import ast
 
@@ -101,4 +103,723 @@ class TestRevealType:
         if reveal_type.sym:
             assert reveal_type.sym in (
                 'foo',
-            )
\ No newline at end of file
+            )
+
+def test_run_all():
+    var = TEST_FILES / 'reveal_type_var.py'
+    reports = list(typy.engine.run_all(files=[var]))
+
+    assert sorted(report.emitter.name for report in reports) == sorted(typy.engine.available)
+
+    for report in reports:
+        engine = typy.engine.get(report.emitter.name)
+        reveal_types = [engine.parse_reveal_type(issue.description) for issue in report.issues]
+        assert len([*filter(bool, reveal_types)]) == 1
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_report_cache(engine: typy.engine.base.EngineModule, tmp_path: Path):
+    var = TEST_FILES / 'reveal_type_var.py'
+    cache = ReportCache(tmp_path)
+
+    first = cache.report(engine, files=[var])
+    second = cache.report(engine, files=[var])
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    # a hit is timed as the lookup, not as the run that stored it
+    assert second.model_copy(update={'timings': first.timings}) == first
+    assert [x.name for x in second.timings or ()] == ['cache']
+
+    edited = {var: var.read_text() + '\nreveal_type(x)\n'}
+    assert cache.key(engine, files=[], sources=edited) != cache.key(engine, files=[], sources={var: var.read_text()})
+
+    key = cache.key(engine, files=[var])
+    cache.put(key, first)
+    assert cache._size == cache._path(key).stat().st_size
+    cache._path(key).write_text('{')
+    assert cache.get(key) is None and not cache._path(key).exists()
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_report_cache_key_inputs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    engine = typy.engine.mypy
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'a.py').write_text('from b import f\nf()\n')
+    (tmp_path / 'src' / 'b.py').write_text('def f() -> None: ...\n')
+    (tmp_path / 'src' / 'c.py').write_text('')
+
+    # only a.py is listed, but what b.py says changes its issues
+    listed = [ReportCache.key(engine, files=[Path('src/a.py')])]
+    (tmp_path / 'src' / 'b.py').write_text('def f(x: int) -> None: ...\n')
+    listed.append(ReportCache.key(engine, files=[Path('src/a.py')]))
+    (tmp_path / 'mypy.ini').write_text('[mypy]\nstrict = True\n')
+    listed.append(ReportCache.key(engine, files=[Path('src/a.py')]))
+    assert len(set(listed)) == len(listed)
+
+    # issues are reported at the renamed path
+    before = ReportCache.key(engine, files=[Path('src')])
+    (tmp_path / 'src' / 'c.py').rename(tmp_path / 'src' / 'd.py')
+    assert ReportCache.key(engine, files=[Path('src')]) != before
+
+
+def test_mypy_daemon(tmp_path: Path):
+    from typy.engine.mypy import Daemon
+
+    var = TEST_FILES / 'reveal_type_var.py'
+    cold = typy.engine.mypy.report(files=[var])
+
+    with Daemon(status_file=tmp_path / 'dmypy.json') as daemon:
+        for _ in range(2):
+            warm = typy.engine.mypy.report(files=[var], daemon=daemon)
+            assert [x.description for x in warm.issues] == [x.description for x in cold.issues]
+
+    assert not daemon.is_alive()
+
+
+@pytest.mark.parametrize('engine', [typy.engine.pyright, typy.engine.ty])
+def test_language_server(engine: typy.engine.base.EngineModule):
+    var = TEST_FILES / 'reveal_type_var.py'
+    cli = engine.report(files=[var])
+
+    with engine.server() as server:
+        lsp = server.report(files=[var])
+        edited = server.check({var: var.read_text() + '\nreveal_type(x)\n'})
+
+    assert [x.description for x in lsp.issues] == [x.description for x in cli.issues]
+    assert len(edited.issues) == len(cli.issues) + 1
+
+
+@pytest.mark.parametrize('engine', [typy.engine.pyright, typy.engine.ty])
+def test_language_server_skips_hints(engine: typy.engine.base.EngineModule, tmp_path: Path):
+    file = tmp_path / 'unused.py'
+    file.write_text('def f():\n    y = 1\n')
+
+    with engine.server(root=tmp_path) as server:
+        lsp = server.report(files=[file])
+    assert lsp.issues == engine.report(files=[file]).issues == []
+
+
+def test_reveal_types():
+    names = ['reveal_type_var', 'reveal_type_walrus', 'reveal_type_constant', 'reveal_type_func']
+    snippets = [(TEST_FILES / f'{name}.py').read_text() for name in names]
+
+    results = typy.reveal_types(snippets)
+    assert len(results) == len(snippets)
+
+    for snippet, result in zip(snippets, results):
+        lines = snippet.splitlines()
+        for reveal_types in result.values():
+            assert len(reveal_types) == 1
+            assert reveal_types[0].line
+            assert 'reveal_type' in lines[reveal_types[0].line - 1]
+
+
+def test_reveal_types_concurrent():
+    from concurrent.futures import ThreadPoolExecutor
+
+    snippets = {kind: f'def f(x: {kind}):\n    reveal_type(x)\n' for kind in ('int', 'str')}
+
+    def reveal(expected: str) -> str:
+        result, = typy.reveal_types([snippets[expected]], engines=['pyright'])
+        return result['pyright'][0].typ
+
+    with ThreadPoolExecutor(4) as pool:
+        kinds = ['int', 'str'] * 4
+        assert list(pool.map(reveal, kinds)) == kinds
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_iter_issues(engine: typy.engine.base.EngineModule):
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+
+    reported = engine.report(files=files).issues
+    streamed = list(engine.iter_issues(files=files))
+
+    assert [x.fingerprint for x in streamed] == [x.fingerprint for x in reported]
+
+
+def test_stream_stdout_raises_process_failure():
+    import subprocess, sys
+    from typy.utils.jsonstream import iter_array
+    from typy.utils.subprocess import stream_stdout
+
+    failing = [sys.executable, '-c', 'import sys; sys.stderr.write("no such config"); sys.exit(2)']
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        with stream_stdout(failing) as stdout:
+            list(iter_array(stdout))
+    assert error.value.returncode == 2 and b'no such config' in error.value.stderr
+
+
+def test_mypy_iter_issues_fails_like_report(tmp_path: Path):
+    missing = [tmp_path / 'missing.py']
+    with pytest.raises(Exception, match='Cannot read file'):
+        typy.engine.mypy.report(files=missing)
+    with pytest.raises(Exception, match='Cannot read file'):
+        list(typy.engine.mypy.iter_issues(files=missing))
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_areport(engine: typy.engine.base.EngineModule):
+    import asyncio
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+
+    reported = engine.report(files=files).issues
+    awaited = asyncio.run(engine.areport(files=files)).issues
+    assert [x.fingerprint for x in awaited] == [x.fingerprint for x in reported]
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(engine.areport(timeout=0.001, files=files))
+
+
+def test_mypy_timeout_kills_check():
+    import asyncio, multiprocessing
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+    with pytest.raises(TimeoutError):
+        asyncio.run(typy.engine.mypy.areport(timeout=0.1, files=files))
+    assert not multiprocessing.active_children()
+
+    reported = typy.engine.mypy.report(files=files).issues
+    awaited = asyncio.run(typy.engine.mypy.areport(timeout=60, files=files)).issues
+    assert [x.fingerprint for x in awaited] == [x.fingerprint for x in reported]
+
+
+def test_partition_keeps_import_clusters(tmp_path: Path):
+    from typy.engine.shard import partition
+
+    (tmp_path / 'a.py').write_text('import b\n')
+    (tmp_path / 'b.py').write_text('x = 1\n')
+    (tmp_path / 'c.py').write_text('y = 2\n' * 100)
+
+    shards = partition([tmp_path], 3, strategy='imports')
+
+    assert sorted(map(len, shards)) == [1, 2]
+    assert [tmp_path / 'a.py', tmp_path / 'b.py'] in shards
+
+
+@pytest.mark.parametrize('engine', [e for e in engines if e.capabilities.shardable])
+def test_run_sharded(engine: typy.engine.base.EngineModule):
+    from typy.engine.shard import Policy
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_var.py', TEST_FILES / 'reveal_type_func.py']
+
+    whole = engine.report(files=files)
+    sharded = typy.engine.run_sharded(engine, files, Policy(workers=2, shards=3))
+
+    assert sorted(x.description for x in sharded.issues) == sorted(x.description for x in whole.issues)
+
+
+@pytest.mark.parametrize('engine', [e for e in engines if e.capabilities.shardable])
+def test_watcher_splices_changed_files(engine: typy.engine.base.EngineModule, tmp_path: Path):
+    # module names differ from TEST_FILES so mypy's cache can't replay their messages
+    for name in ('var', 'func'):
+        (tmp_path / f'watched_{name}.py').write_text((TEST_FILES / f'reveal_type_{name}.py').read_text())
+
+    watcher = typy.watch.Watcher([tmp_path], engines=[engine.name])
+    first = watcher.tick()
+    assert watcher.tick() is first
+
+    edited = tmp_path / 'watched_var.py'
+    edited.write_text(edited.read_text() + '\nreveal_type(x)\n')
+    spliced = watcher.tick()[engine.name]
+
+    fresh = engine.report(files=[tmp_path], **engine.shard_options)
+    assert sorted(x.description for x in spliced.issues) == sorted(x.description for x in fresh.issues)
+
+
+def test_watcher_parses_only_changed_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from typy.utils.imports import imported_modules
+
+    parsed = list[str]()
+    def counted(path: Path) -> set[str]:
+        parsed.append(path.name)
+        return imported_modules(path)
+    monkeypatch.setattr(typy.watch, 'imported_modules', counted)
+
+    for name in 'abc':
+        (tmp_path / f'{name}.py').write_text('x = 1\n')
+    watcher = typy.watch.Watcher([tmp_path], engines=['ty'])
+    watcher.tick()
+    assert sorted(parsed) == ['a.py', 'b.py', 'c.py']
+
+    parsed.clear()
+    (tmp_path / 'b.py').write_text('import a\n')
+    watcher.tick()
+    assert parsed == ['b.py']
+    assert watcher._graph[(tmp_path / 'b.py').resolve()] == {(tmp_path / 'a.py').resolve()}
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_issue_table_roundtrip(engine: typy.engine.base.EngineModule):
+    from typy.formats import IssueTable, codeclimate
+
+    report = engine.report(files=[TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py'])
+    columnar = report.columnar()
+
+    assert isinstance(columnar.issues, IssueTable)
+    assert list(columnar.issues) == report.issues
+    assert columnar.model_dump_json() == report.model_dump_json()
+
+    # subclass fields survive too
+    climate = codeclimate.Report(**{**dict(report), 'issues': list(map(codeclimate.from_gitlab, report.issues))})
+    assert climate.columnar().model_dump_json() == climate.model_dump_json()
+
+
+@pytest.mark.parametrize('engine', [typy.engine.mypy, typy.engine.ty])
+def test_columnar_reports(engine: typy.engine.base.EngineModule):
+    from typy.formats import IssueTable
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_var.py']
+    report = engine.report(files=files)
+    columnar = engine.report(files=files, columnar=True)
+    # engines don't always report files in the same order
+    ordered = lambda issues: sorted(issues, key=lambda x: x.model_dump_json())
+    assert isinstance(columnar.issues, IssueTable)
+    assert ordered(columnar.issues) == ordered(report.issues)
+
+    virtual = {'/virtual/var.py': (TEST_FILES / 'reveal_type_var.py').read_text()}
+    restored = engine.report(files=[], sources=virtual, columnar=True)
+    assert isinstance(restored.issues, IssueTable)
+    assert ordered(restored.issues) == ordered(engine.report(files=[], sources=virtual).issues)
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_trusted_issues_validate(engine: typy.engine.base.EngineModule):
+    from pydantic import ValidationError
+    from typy.formats import gitlab, trusted
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+    fast = engine.report(files=files)
+    assert gitlab.Report.model_validate_json(fast.model_dump_json()) == fast
+
+    # built in one pass, but still validated
+    with pytest.raises(ValidationError):
+        trusted.issue('check', 'message', '/a.py', 0, 1, 1, 1)
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_shift_resistant_fingerprints(engine: typy.engine.base.EngineModule, tmp_path: Path):
+    from typy.utils.fingerprint import ShiftResistant, fingerprint_table
+
+    file = tmp_path / 'shifted_func.py'
+    source = (TEST_FILES / 'reveal_type_func.py').read_text()
+
+    # line contents are read when fingerprinting, so do it before editing
+    file.write_text(source)
+    before = fingerprint_table(engine.report(files=[file]).columnar().issues, shift_resistant=True)
+    file.write_text('\n\n' + source)
+    after = fingerprint_table(engine.report(files=[file]).columnar().issues, shift_resistant=True)
+
+    assert [x.location.positions for x in before] != [x.location.positions for x in after] or not len(before)
+    assert before.fingerprints == after.fingerprints
+    assert list(map(ShiftResistant(), after)) == [after.fingerprint(i) for i in range(len(after))]
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_baseline_diff(engine: typy.engine.base.EngineModule, tmp_path: Path):
+    from typy import baseline
+
+    file = tmp_path / 'baselined_var.py'
+    source = (TEST_FILES / 'reveal_type_var.py').read_text()
+    file.write_text(source)
+    saved = baseline.save([engine.report(files=[file])], tmp_path / 'baseline.json')
+    stored = baseline.Baseline(tmp_path / 'baseline.json')
+    assert len(stored) == len({x.fingerprint for x in saved.issues})
+
+    # lines inserted above baselined issues don't make them new
+    file.write_text('import os\n\n' + source)
+    assert baseline.diff(stored, [engine.report(files=[file])]) == ([], [])
+
+    file.write_text(source + '\nreveal_type(1)\n')
+    new, fixed = baseline.diff(stored, [engine.report(files=[file])])
+    assert not fixed
+    assert len(new) == (1 if saved.issues else 0)
+
+    file.write_text('')
+    new, fixed = baseline.diff(stored, [engine.report(files=[file])])
+    assert not new
+    assert sorted(x.description for x in fixed) == sorted(x.description for x in saved.issues)
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_baseline_foreign_reports(engine: typy.engine.base.EngineModule, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from typy import baseline
+    from typy.formats.stream import GitlabWriter
+
+    for checkout in ('a', 'b'):
+        (tmp_path / checkout).mkdir()
+        (tmp_path / checkout / 'baselined_var.py').write_text((TEST_FILES / 'reveal_type_var.py').read_text())
+
+    monkeypatch.chdir(tmp_path / 'a')
+    report = engine.report(files=[Path('baselined_var.py')])
+
+    # a plain gitlab report and `typy check -f gitlab`'s array are keyed like current issues
+    (tmp_path / 'report.json').write_text(report.model_dump_json())
+    with (tmp_path / 'array.json').open('wb') as f, GitlabWriter(f) as writer:
+        writer.write(report.issues)
+    for name in ('report.json', 'array.json'):
+        assert baseline.diff(baseline.Baseline(tmp_path / name), [report]) == ([], [])
+
+    # saved baselines match in another checkout
+    baseline.save([report], tmp_path / 'baseline.json')
+    monkeypatch.chdir(tmp_path / 'b')
+    assert baseline.diff(baseline.Baseline(tmp_path / 'baseline.json'), [engine.report(files=[Path('baselined_var.py')])]) == ([], [])
+
+    (tmp_path / 'bad.json').write_text('"issues"')
+    with pytest.raises(ValueError, match='not a gitlab report'):
+        baseline.Baseline(tmp_path / 'bad.json')
+
+
+def test_resolve_path_follows_retargeted_symlink(tmp_path: Path):
+    from typy.utils.path import resolve_path
+
+    (tmp_path / 'a.py').touch()
+    (tmp_path / 'b.py').touch()
+    link = tmp_path / 'link.py'
+    link.symlink_to(tmp_path / 'a.py')
+    assert resolve_path(link) == str((tmp_path / 'a.py').resolve())
+
+    link.unlink()
+    link.symlink_to(tmp_path / 'b.py')
+    assert resolve_path(link) == str((tmp_path / 'b.py').resolve())
+
+
+def test_source_cache(tmp_path: Path):
+    from typy.utils.source import SourceCache
+
+    small, large = tmp_path / 'small.py', tmp_path / 'large.py'
+    small.write_text('a = 1\r\nb = 2\n\nc = 3')
+    large.write_text('x = 0\n' * 100)
+
+    cache = SourceCache(max_bytes=600)
+    lines = cache.lines(small)
+    assert list(lines) == small.read_text().splitlines()
+    assert lines[1:3] == ['b = 2', '']
+    assert cache.lines(small) is lines
+
+    cache.lines(large)
+    assert len(cache) == 1
+
+    small.write_text('d = 4\n')
+    assert list(cache.lines(small)) == ['d = 4']
+
+    # lines handed out stay readable after the file is rewritten in place
+    held = SourceCache().lines(large)
+    with open(large, 'r+b') as f:
+        f.truncate(0)
+        f.write(b'y = 1\n')
+    assert held[99] == 'x = 0'
+
+
+@pytest.mark.parametrize('engine', engines)
+def test_show_plain_matches_rich(engine: typy.engine.base.EngineModule):
+    import io
+    from rich.console import Console
+    from rich.text import Text
+
+    report = engine.report(files=[TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py'])
+
+    plain, rich = Console(file=io.StringIO()), Console(file=io.StringIO(), force_terminal=True, width=20)
+    report.show(console=plain)
+    report.columnar().show(console=rich)
+
+    text = plain.file.getvalue()
+    assert '\x1b[' not in text
+    assert text.count('>>> ') == len(report.issues)
+    assert Text.from_ansi(rich.file.getvalue()).plain == text
+
+
+@pytest.mark.parametrize('format', typy.cli.formats)
+def test_cli_check_formats(format: str, tmp_path: Path):
+    import json
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+    expected = sum(len(typy.engine.get(name).report(files=files).issues) for name in ('ty', 'pyright'))
+
+    output = tmp_path / 'out'
+    status = typy.main(['check', '-e', 'ty', '-e', 'pyright', '-j', '2', '-f', format, '-o', str(output), *map(str, files)])
+    assert status == (1 if expected else 0)
+
+    text = output.read_text()
+    match format:
+        case 'jsonl':
+            issues = [json.loads(line) for line in text.splitlines()]
+        case 'sarif':
+            issues = [x for run in json.loads(text)['runs'] for x in run['results']]
+        case 'codeclimate-nul':
+            assert text.endswith('\0')
+            issues = [json.loads(x) for x in text.split('\0')[:-1]]
+        case _:
+            issues = json.loads(text)
+    assert len(issues) == expected
+
+
+def _imported(code: str) -> set[str]:
+    import os, subprocess, sys
+
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, env=env, check=True)
+    return {line.rsplit('|', 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+
+def test_utils_fingerprint_is_the_function():
+    import sys
+    import typy.utils.fingerprint
+    from typy.utils import fingerprint
+
+    assert fingerprint is sys.modules['typy.utils.fingerprint'].fingerprint
+
+
+def test_lazy_imports():
+    assert not {'pydantic', 'rich', 'typy.engine'} & _imported('import typy')
+
+    imported = _imported("import typy.engine; typy.engine.get('ty')")
+    assert 'typy.engine.ty.command' in imported
+    assert not {'rich', 'mypy', 'pyright'} & imported
+    assert not [x for x in imported if x.startswith(('typy.engine.mypy', 'typy.engine.pyright', 'typy.engine.pyrefly'))]
+
+
+def test_registry_entry_points(monkeypatch: pytest.MonkeyPatch):
+    from importlib.metadata import EntryPoint
+    from typy.engine import registry as registry_module
+    from typy.engine.registry import Registry, registry as default
+
+    # what `[project.entry-points."typy.engines"]` in a plugin's pyproject declares
+    plugin = EntryPoint('basedpyright', 'typy.engine.pyright:Module', 'typy.engines')
+    monkeypatch.setattr(registry_module, 'entry_points', lambda group: [plugin] if group == 'typy.engines' else [])
+
+    registry = Registry()
+    assert registry.names() == ['ty', 'pyright', 'pyrefly', 'mypy', 'basedpyright']
+    assert registry.get('basedpyright') is typy.engine.pyright
+    assert registry.get('mypy') is typy.engine.mypy is default.get('mypy')
+    assert registry.select(shardable=True) == ['ty', 'pyrefly', 'mypy']
+    assert registry.select(parallelizable=False) == ['mypy']
+
+    with pytest.raises(ValueError):
+        registry.get('zuban')
+
+
+def test_runtime_engine_in_worker(monkeypatch: pytest.MonkeyPatch):
+    from typy.engine.registry import registry
+    from typy.engine.runner import run_all
+
+    monkeypatch.setattr(registry, '_targets', {**registry._targets})
+    registry.register('mypy-copy', typy.engine.mypy)
+    assert registry.target('mypy-copy') == 'typy.engine.mypy.command:Module'
+
+    # mypy isn't parallelizable, so it runs in a spawned worker that must find it
+    files = [TEST_FILES / 'sample_file.py']
+    report, = run_all(files=files, engines=['mypy-copy'])
+    assert len(report.issues) == len(typy.engine.mypy.report(files=files).issues)
+
+
+def test_bench(tmp_path: Path):
+    from typy.bench import Results, corpus
+
+    files, description = corpus(tmp_path / 'corpus', files=3, functions=4, density=0.5, seed=1)
+    assert len(files) == 3 and description.errors
+
+    output = tmp_path / 'bench.json'
+    assert typy.main(['bench', 'run', '-e', 'ty', '--files', '3', '--functions', '4', '--density', '0.5', '--seed', '1', '--reps', '2', '--warmup', '0', '-o', str(output)]) == 0
+    results = Results.model_validate_json(output.read_text())
+    result = results.engines['ty']
+    assert len(result.samples) == 2
+    assert all(x.issues == description.errors for x in result.samples)
+    assert result.wall_s.min > 0 and result.peak_rss
+
+    assert typy.main(['bench', 'compare', str(output), str(output)]) == 0
+
+
+def test_report_timings(tmp_path: Path):
+    import io, json
+    from typy.utils import trace
+
+    memory, out, payloads = trace.MemorySink(), io.StringIO(), list[dict]()
+    otlp = trace.OtlpSink(payloads.append)
+    trace.sinks.extend([memory, trace.JsonlSink(out), otlp])
+    try:
+        report = typy.engine.get('pyright').report(files=[TEST_FILES / 'sample_file.py'])
+    finally:
+        trace.sinks.clear()
+    otlp.flush()
+
+    assert report.timings
+    names = [x.name for x in report.timings]
+    assert {'process', 'compute', 'decode', 'parse', 'validate', 'convert', 'fingerprint', 'version'} <= set(names)
+    root, = [x for x in report.timings if x.parent is None]
+    assert root.name == 'report' and names[-1] == 'report'
+    assert all(x.trace == root.id for x in report.timings)
+    assert all(x.fingerprint for x in report.issues)
+
+    assert memory.spans == report.timings
+    assert [json.loads(line)['name'] for line in out.getvalue().splitlines()] == names
+    spans, = [x['spans'] for payload in payloads for x in payload['resourceSpans'][0]['scopeSpans']]
+    assert [x['name'] for x in spans] == names
+
+
+@pytest.mark.parametrize('name', ['mypy', 'pyright'])
+def test_report_sources(name: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from typy.engine.overlay import Overlay
+    from typy.utils.path import resolve_path
+
+    monkeypatch.chdir(tmp_path)
+    overlay = Overlay(tmp_path / 'overlay', keep=1)
+    monkeypatch.setattr('typy.engine.base.overlay', overlay)
+    engine = typy.engine.get(name)
+    assert engine.capabilities.stdin == (name == 'mypy')
+
+    sources = {'virtual_pkg/__init__.py': '', 'virtual_pkg/mod.py': 'from .dep import y\nx: int = y\n', 'virtual_pkg/dep.py': 'y = ""\n'}
+    report = engine.report(sources=sources)
+    issue, = [x for x in report.issues if x.severity == 'major']
+    assert issue.location.path == resolve_path('virtual_pkg/mod.py')
+    assert issue.fingerprint
+    assert not (tmp_path / 'virtual_pkg').exists()
+
+    if name == 'pyright':
+        tree, = (tmp_path / 'overlay').iterdir()
+        written = {x: x.stat().st_mtime_ns for x in tree.rglob('*.py')}
+        assert len(written) == 3
+        again = engine.report(sources=sources)
+        assert [x.fingerprint for x in again.issues] == [x.fingerprint for x in report.issues]
+        assert {x: x.stat().st_mtime_ns for x in tree.rglob('*.py')} == written
+
+        engine.report(sources={**sources, 'virtual_pkg/dep.py': 'y = 1\n'})
+        assert [x.name for x in (tmp_path / 'overlay').iterdir()] != [tree.name]
+
+
+def test_mypy_pool():
+    from typy.engine.mypy import Module, Pool
+    from typy.engine.mypy.pool import _ready
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_var.py']
+    expected = Module.report(files=files)
+
+    with Pool(size=1, max_tasks=2) as pool:
+        # warming up took the worker's first task, this is its last
+        first = pool._pool().submit(_ready).result()
+        report = Module.report(files=files, pool=pool)
+        # mypy's output order depends on what it found in its cache
+        assert sorted(x.model_dump_json() for x in report.issues) == sorted(x.model_dump_json() for x in expected.issues)
+        assert pool._pool().submit(_ready).result() != first
+
+
+def test_consensus():
+    from datetime import datetime, timedelta
+    from typy.consensus import Index, merge
+    from typy.formats import gitlab, report, trusted
+
+    def make(engine: str, *spans: tuple[int, int, int]) -> gitlab.Report:
+        issues = [trusted.issue('check', f'{engine} {i}', '/a.py', line, begin, line, end, 'major' if engine == 'b' else 'minor') for i, (line, begin, end) in enumerate(spans)]
+        return gitlab.Report(issues=issues, elapsed=timedelta(), time=datetime.now(), emitter=report.Emitter(name=engine, version=None))
+
+    reports = [
+        make('a', (1, 5, 5), (2, 1, 3), (3, 1, 1)),
+        make('b', (1, 4, 9), (2, 7, 8)),
+        make('c', (1, 9, 12), (2, 1, 1), (3, 1, 1)),
+    ]
+    index = Index(reports)
+    assert [(x.line, x.begin_column, x.end_column, x.agreement) for x in index] == [(1, 4, 12, 3), (2, 1, 3, 2), (2, 7, 8, 1), (3, 1, 1, 2)]
+    assert [x.begin_column for x in index.at('/a.py', 2)] == [1, 7]
+    assert [x.begin_column for x in index.at('/a.py', 2, 8)] == [7]
+    assert index.at('/a.py', 2, 5) == [] and index.at('/b.py', 1) == []
+
+    merged = merge(reports, min_engines=2)
+    assert [(x.description, x.engines) for x in merged.issues] == [('b 0', ['a', 'b', 'c']), ('c 1', ['a', 'c']), ('a 2', ['a', 'c'])]
+    assert [x.description for x in merge(reports, slack=4).issues if x.location.positions.begin.line == 2] == ['b 1', 'c 1']
+
+    # one engine's distinct findings stay apart, and agreement doesn't chain through b
+    chained = merge([make('a', (1, 1, 5), (1, 3, 4)), make('b', (1, 4, 80)), make('c', (1, 70, 71))])
+    assert [(x.description, x.agreement) for x in chained.issues] == [('b 0', 3), ('a 1', 1)]
+    chained = merge([make('a', (1, 1, 2)), make('c', (1, 1, 80)), make('d', (1, 70, 71))])
+    assert [(x.description, x.engines) for x in chained.issues] == [('a 0', ['a', 'c']), ('d 0', ['d'])]
+
+
+def test_consensus_gc_pauses_nest():
+    import gc
+    from typy.consensus import _gc_paused
+
+    assert gc.isenabled()
+    outer, inner = _gc_paused(), _gc_paused()
+    outer.__enter__()
+    inner.__enter__()
+    outer.__exit__(None, None, None)
+    # another pause is still running, possibly on another thread
+    assert not gc.isenabled()
+    inner.__exit__(None, None, None)
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        with _gc_paused(): pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_cli_check_agree(tmp_path: Path):
+    import json
+
+    output = tmp_path / 'out.json'
+    status = typy.main(['check', '-e', 'mypy', '-e', 'pyright', '-e', 'ty', '--agree', '3', '-o', str(output), str(TEST_FILES / 'sample_file.py')])
+    issue, = json.loads(output.read_text())
+    assert status == 1
+    assert issue['engines'] == ['mypy', 'pyright', 'ty'] and issue['agreement'] == 3
+
+
+def test_stream_writers(tmp_path: Path):
+    import io, json, os
+    from typy.formats import stream
+    from typy.formats.report import Emitter
+
+    report = typy.engine.get('pyright').report(files=[TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py'])
+    emitter = Emitter(name='pyright', version=None)
+    assert report.issues
+
+    def written(writer: type[stream.Writer], out: stream.Output) -> int:
+        with writer(out) as w:
+            w.write(iter(report.issues), emitter)
+            w.write(iter([]), emitter)
+            return w.count
+
+    binary, text = io.BytesIO(), io.StringIO()
+    assert written(stream.GitlabWriter, binary) == written(stream.GitlabWriter, text) == len(report.issues)
+    assert json.loads(binary.getvalue()) == json.loads(text.getvalue()) == [x.model_dump(mode='json') for x in report.issues]
+
+    # text streams keep their encoding, whatever their class
+    class Lines:
+        def __init__(self):
+            self.parts = list[str]()
+        def write(self, s: str):
+            self.parts.append(s)
+        def flush(self): ...
+
+    lines, wide = Lines(), io.TextIOWrapper(io.BytesIO(), encoding='utf-16')
+    written(stream.GitlabWriter, lines)  # pyright: ignore[reportArgumentType]
+    written(stream.GitlabWriter, wide)
+    assert ''.join(lines.parts) == text.getvalue()
+    assert wide.buffer.getvalue().decode('utf-16') == text.getvalue()  # pyright: ignore[reportAttributeAccessIssue]
+
+    with open(tmp_path / 'out', 'wb') as file:
+        written(stream.SarifWriter, file.fileno())
+    runs = json.loads((tmp_path / 'out').read_text())['runs']
+    assert [len(x['results']) for x in runs] == [len(report.issues), 0]
+
+    out = io.BytesIO()
+    written(stream.JsonlWriter, out)
+    lines = [json.loads(x) for x in out.getvalue().splitlines()]
+    assert {x.pop('engine') for x in lines} == {'pyright'}
+    assert lines == [x.model_dump(mode='json') for x in report.issues]
+
+
+def test_cli_check_stream(tmp_path: Path):
+    import json
+
+    files = [TEST_FILES / 'sample_file.py', TEST_FILES / 'reveal_type_func.py']
+    output = tmp_path / 'out'
+    status = typy.main(['check', '--stream', '-e', 'ty', '-e', 'pyright', '-f', 'jsonl', '-o', str(output), *map(str, files)])
+    issues = [json.loads(line) for line in output.read_text().splitlines()]
+    assert status == 1
+    assert {x['engine'] for x in issues} == {'ty', 'pyright'}
+    assert typy.main(['check', '--stream', '--agree', '2', str(files[0])]) == 2